@@ -0,0 +1,134 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import CompanyCommit
+
+# 조직도 읽기 캐시. 모든 entry는 (org version, payload)로 저장되며,
+# 조직도가 바뀌면 version만 올리고 이전 version의 entry는 덮어쓰이거나 timeout으로 만료된다.
+ORG_VERSION_KEY = "company:org-version"
+ORG_CACHE_TIMEOUT = getattr(settings, "COMPANY_ORG_CACHE_TIMEOUT", 60 * 10)
+
+
+def _initial_version():
+    # cache가 비워져도 이전에 쓰던 version과 겹치지 않도록 시간 기반으로 시작
+    return int(time.time() * 1000)
+
+
+def org_version():
+    version = cache.get(ORG_VERSION_KEY)
+    if version is None:
+        cache.add(ORG_VERSION_KEY, _initial_version(), None)
+        version = cache.get(ORG_VERSION_KEY)
+    return version
+
+
+def bump_org_version():
+    try:
+        return cache.incr(ORG_VERSION_KEY)
+    except ValueError:
+        version = _initial_version()
+        cache.set(ORG_VERSION_KEY, version, None)
+        return version
+
+
+def invalidate_org_cache():
+    """조직도 write 경로에서 호출. transaction commit 이후에 version을 올림."""
+    transaction.on_commit(bump_org_version)
+
+
+def org_etag(request, *args, **kwargs):
+    """
+    조직도 응답의 ETag: org version(cache 한 번 조회, DB 조회 없음).
+    commit 생성/수정도 signal에서 org version을 올리므로 최신 commit은 조회하지 않음.
+    """
+    return f"org-{org_version()}"
+
+
+def _team_members_key(t_id):
+    return f"company:team-members-version:{t_id}"
+
+
+def team_etag(request, t_id, *args, **kwargs):
+    """
+    팀 상세 응답의 ETag: org version + 팀원 version (get_many 한 번, DB 조회 없음).
+    팀원 구성이나 팀원 인사카드(이름/연락처/소속/직무)가 바뀌면 invalidate_team_members로
+    팀원 version이 새 값으로 바뀜.
+    """
+    key = _team_members_key(t_id)
+    values = cache.get_many([ORG_VERSION_KEY, key])
+    version = values.get(ORG_VERSION_KEY)
+    if version is None:
+        version = org_version()
+    members_version = values.get(key)
+    if members_version is None:
+        cache.add(key, _initial_version(), None)
+        members_version = cache.get(key)
+    return f"team-{version}-{members_version}"
+
+
+def invalidate_team_members(team_ids):
+    """해당 팀들의 팀원 version을 transaction commit 이후 삭제 (다음 조회 시 새 값으로 시작)."""
+    keys = [_team_members_key(t_id) for t_id in team_ids if t_id is not None]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def current_commit_etag(request, *args, **kwargs):
+    """현재 commit 응답의 ETag: org ETag + commit 작성자(created_by)의 card_version."""
+    c_id = request.GET.get("c_id")
+    commits = CompanyCommit.objects.order_by("-commit_id")
+    if c_id:
+        if not c_id.isdigit():
+            return None
+        commits = commits.filter(actions__corporation_id=c_id)
+    card_version = commits.values_list("created_by__card_version", flat=True).first()
+    return f"{org_etag(request)}-{card_version}"
+
+
+def cached_org_payload(key, build):
+    """
+    org version과 payload를 한 번의 get_many로 읽어 현재 version으로 만든 payload면 반환,
+    아니면 build()로 만들어 (version, payload)로 저장.
+    """
+    values = cache.get_many([ORG_VERSION_KEY, key])
+    version = values.get(ORG_VERSION_KEY)
+    if version is None:
+        version = org_version()
+    entry = values.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    payload = build()
+    cache.set(key, (version, payload), ORG_CACHE_TIMEOUT)
+    return payload
+
+
+class OrgCacheMixin:
+    """
+    GET 응답을 org version 단위로 캐시하는 APIView mixin (에러는 예외로 전파되어 캐시되지 않음).
+    key는 org_cache_prefix + path + 정렬된 query string의 hash (get_org_cache_key로 변경 가능).
+    """
+
+    org_cache_prefix = "company"
+
+    def get_org_cache_key(self, request):
+        query = "&".join(
+            f"{key}={value}"
+            for key, values in sorted(request.query_params.lists())
+            for value in values
+        )
+        # 사용자 입력을 그대로 key에 넣지 않고 길이도 일정하게 유지
+        digest = hashlib.sha256(query.encode()).hexdigest()
+        return f"{self.org_cache_prefix}:{request.path}?{digest}"
+
+    def get(self, request, *args, **kwargs):
+        data = cached_org_payload(
+            self.get_org_cache_key(request),
+            lambda: super(OrgCacheMixin, self).get(request, *args, **kwargs).data,
+        )
+        return Response(data, status=status.HTTP_200_OK)
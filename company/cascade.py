@@ -0,0 +1,120 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from person.models import Person
+from search.indexing import refresh_search_documents
+from .models import (
+    Corporation,
+    Team,
+    Role,
+    CompanyCommitAction,
+    CorporationNameHistoryInfo,
+    TeamNameHistoryInfo,
+    TeamParentHistoryInfo,
+)
+
+
+def deactivate_teams(teams, commit=None, record_parent_history=False):
+    """
+    teams(Team, t_id 또는 queryset)와 하위 조직 전체를 set 단위로 비활성화.
+      - 활성 팀 전체를 closure table로 한 번에 조회 후 bulk UPDATE
+      - 해당 팀들의 진행 중 Role(end_date가 null)을 bulk UPDATE로 종료 (해당 사람의 card_version 증가)
+      - 팀원의 PersonSearchDocument 갱신
+      - commit이 주어지면 이름/상위조직 히스토리와 DELETE action을 bulk_create
+    영향받은 row 수를 dict로 반환.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        team_corporations = dict(
+            Team.objects.descendants_of(teams)
+            .filter(is_active=True)
+            .values_list("t_id", "corporation_id")
+        )
+        team_ids = list(team_corporations)
+        # bulk UPDATE는 signal이 없으므로 Role이 종료되는 사람의 card_version 직접 증가
+        Person.objects.filter(
+            roles__team_id__in=team_ids, roles__end_date__isnull=True
+        ).bump_card_version()
+        summary = {
+            "teams": Team.objects.filter(t_id__in=team_ids).update(
+                is_active=False, deleted_at=Coalesce(F("deleted_at"), now)
+            ),
+            "roles": Role.objects.filter(
+                team_id__in=team_ids, end_date__isnull=True
+            ).update(end_date=now),
+            "name_histories": 0,
+            "parent_histories": 0,
+            "actions": 0,
+        }
+        # bulk UPDATE는 signal이 없으므로 팀원의 검색 문서(활성 팀/직무) 직접 갱신
+        refresh_search_documents(
+            Team.members.through.objects.filter(team_id__in=team_ids).values(
+                "person_id"
+            )
+        )
+        if commit is None or not team_ids:
+            return summary
+
+        summary["name_histories"] = len(
+            TeamNameHistoryInfo.objects.bulk_create(
+                [
+                    TeamNameHistoryInfo(team_id=t_id, name="", commit=commit)
+                    for t_id in team_ids
+                ]
+            )
+        )
+        if record_parent_history:
+            summary["parent_histories"] = len(
+                TeamParentHistoryInfo.objects.bulk_create(
+                    [
+                        TeamParentHistoryInfo(
+                            team_id=t_id, parent_team=None, commit=commit
+                        )
+                        for t_id in team_ids
+                    ]
+                )
+            )
+        summary["actions"] = len(
+            CompanyCommitAction.objects.bulk_create(
+                [
+                    CompanyCommitAction(
+                        commit=commit,
+                        target_type=CompanyCommitAction.TargetType.TEAM.name,
+                        action=CompanyCommitAction.CommitType.DELETE,
+                        target_id=t_id,
+                        corporation_id=team_corporations[t_id],
+                    )
+                    for t_id in team_ids
+                ]
+            )
+        )
+    return summary
+
+
+def deactivate_corporation(corporation, commit=None):
+    """
+    법인과 소속 팀(및 하위 조직) 전체를 비활성화. deactivate_teams의 summary에
+    corporations 항목을 추가하여 반환.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        updated = Corporation.objects.filter(
+            c_id=corporation.c_id, is_active=True
+        ).update(is_active=False, deleted_at=Coalesce(F("deleted_at"), now))
+        summary = deactivate_teams(corporation.teams.all(), commit)
+        summary["corporations"] = updated
+        if commit is not None and updated:
+            CorporationNameHistoryInfo.objects.create(
+                corporation=corporation, name="", commit=commit
+            )
+            CompanyCommitAction.objects.create(
+                commit=commit,
+                target_type=CompanyCommitAction.TargetType.CORPORATION.name,
+                action=CompanyCommitAction.CommitType.DELETE,
+                target_id=corporation.c_id,
+                corporation=corporation,
+            )
+            summary["actions"] += 1
+    return summary
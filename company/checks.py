@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core import checks
+
+# process마다 따로 저장되는 cache backend. 권한 범위/조직도 version 등을 worker 간에
+# 공유할 수 없어 무효화가 다른 worker에 전달되지 않음
+PER_PROCESS_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+# 공유는 되지만 cache hit마다 DB query/파일 읽기가 발생하여 캐시의 의미가 없는 backend
+SLOW_CACHE_BACKENDS = (
+    "django.core.cache.backends.db.DatabaseCache",
+    "django.core.cache.backends.filebased.FileBasedCache",
+)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if backend in SLOW_CACHE_BACKENDS:
+        return [
+            checks.Warning(
+                f"default cache backend '{backend}'는 cache hit마다 DB/파일을 읽습니다.",
+                hint="Redis, Memcached 등 공유 in-memory cache를 사용하세요.",
+                id="company.W001",
+            )
+        ]
+    if backend not in PER_PROCESS_CACHE_BACKENDS:
+        return []
+    return [
+        checks.Error(
+            f"default cache backend '{backend}'는 worker 간에 공유되지 않습니다.",
+            hint=(
+                "권한 범위 캐시와 무효화 counter가 모든 worker에 반영되도록 "
+                "Redis, Memcached 등 공유 cache를 사용하세요."
+            ),
+            id="company.E001",
+        )
+    ]
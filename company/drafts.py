@@ -0,0 +1,511 @@
+import copy
+import json
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F, Func, Value
+from django.utils import timezone
+from rest_framework import serializers
+
+from .cache import invalidate_org_cache
+from .cascade import deactivate_teams
+from .permissions import invalidate_all_auth_scopes
+from .models import (
+    Corporation,
+    Team,
+    Draft,
+    CompanyCommit,
+    CompanyCommitAction,
+    CorporationNameHistoryInfo,
+    TeamNameHistoryInfo,
+    TeamParentHistoryInfo,
+)
+
+TEAM = CompanyCommitAction.TargetType.TEAM.name
+CORPORATION = CompanyCommitAction.TargetType.CORPORATION.name
+
+# patch 누적 크기가 이 값을 넘으면 base 문서로 compaction
+COMPACT_BYTES = getattr(settings, "COMPANY_DRAFT_COMPACT_BYTES", 256 * 1024)
+
+PATCH_OPS = {"add", "remove", "replace", "move", "copy", "test"}
+
+
+class JSONBConcat(Func):
+    """jsonb || jsonb (배열 뒤에 원소 추가)"""
+
+    arg_joiner = " || "
+    template = "%(expressions)s"
+    output_field = models.JSONField()
+
+
+def _split_pointer(pointer):
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise serializers.ValidationError(f"잘못된 JSON pointer입니다: {pointer}")
+    return [
+        token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")
+    ]
+
+
+def _resolve(document, tokens, pointer):
+    for token in tokens:
+        try:
+            if isinstance(document, list):
+                document = document[int(token)]
+            else:
+                document = document[token]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise serializers.ValidationError(f"존재하지 않는 경로입니다: {pointer}")
+    return document
+
+
+def _add(document, pointer, value):
+    tokens = _split_pointer(pointer)
+    if not tokens:
+        return value
+    parent = _resolve(document, tokens[:-1], pointer)
+    key = tokens[-1]
+    if isinstance(parent, list):
+        index = len(parent) if key == "-" else _list_index(parent, key, pointer, 1)
+        parent.insert(index, value)
+    elif isinstance(parent, dict):
+        parent[key] = value
+    else:
+        raise serializers.ValidationError(f"존재하지 않는 경로입니다: {pointer}")
+    return document
+
+
+def _remove(document, pointer):
+    tokens = _split_pointer(pointer)
+    if not tokens:
+        raise serializers.ValidationError("문서 전체는 remove할 수 없습니다.")
+    parent = _resolve(document, tokens[:-1], pointer)
+    key = tokens[-1]
+    if isinstance(parent, list):
+        return parent.pop(_list_index(parent, key, pointer))
+    if isinstance(parent, dict) and key in parent:
+        return parent.pop(key)
+    raise serializers.ValidationError(f"존재하지 않는 경로입니다: {pointer}")
+
+
+def _list_index(parent, key, pointer, extra=0):
+    if not key.isdigit() or int(key) >= len(parent) + extra:
+        raise serializers.ValidationError(f"잘못된 배열 index입니다: {pointer}")
+    return int(key)
+
+
+def validate_patch(operations):
+    """JSON Patch 형식만 검사. 문서에 적용 가능한지는 append_draft_patch에서 확인."""
+    if not isinstance(operations, list):
+        raise serializers.ValidationError("patches는 배열이어야 합니다.")
+    for i, operation in enumerate(operations):
+        if (
+            not isinstance(operation, dict)
+            or operation.get("op") not in PATCH_OPS
+            or not isinstance(operation.get("path"), str)
+        ):
+            raise serializers.ValidationError(f"patches[{i}]: 잘못된 operation입니다.")
+        if operation["op"] in ("move", "copy") and "from" not in operation:
+            raise serializers.ValidationError(f"patches[{i}]: from이 필요합니다.")
+        if operation["op"] in ("add", "replace", "test") and "value" not in operation:
+            raise serializers.ValidationError(f"patches[{i}]: value가 필요합니다.")
+    return operations
+
+
+def apply_json_patch(document, operations):
+    """RFC 6902 JSON Patch를 document에 순서대로 적용한 결과를 반환 (원본 불변)."""
+    document = copy.deepcopy(document)
+    for operation in operations:
+        op, path = operation["op"], operation["path"]
+        if op == "add":
+            document = _add(document, path, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            _remove(document, path)
+        elif op == "replace":
+            _resolve(document, _split_pointer(path), path)
+            if _split_pointer(path):
+                _remove(document, path)
+            document = _add(document, path, copy.deepcopy(operation["value"]))
+        elif op == "move":
+            value = _remove(document, operation["from"])
+            document = _add(document, path, value)
+        elif op == "copy":
+            value = _resolve(document, _split_pointer(operation["from"]), path)
+            document = _add(document, path, copy.deepcopy(value))
+        elif op == "test":
+            if _resolve(document, _split_pointer(path), path) != operation["value"]:
+                raise serializers.ValidationError(f"test 실패: {path}")
+    return document
+
+
+def draft_document(draft):
+    """base 문서(changes)에 누적된 patches를 적용한 현재 draft 내용."""
+    if not draft.patches:
+        return draft.changes
+    return apply_json_patch(draft.changes, draft.patches)
+
+
+def append_draft_patch(draft, operations, version):
+    """
+    자동저장: draft row를 잠근 뒤 현재 문서에 patch를 적용해 보고, 적용되는 경우에만
+    UPDATE 한 번으로 patches 뒤에 이어붙임. 없는 경로/test 실패 등 적용할 수 없는 patch는
+    ValidationError로 거부되어 저장되지 않는다.
+    version이 다르면(다른 곳에서 먼저 저장) None, 성공하면 새 version을 반환.
+    누적 크기가 COMPACT_BYTES를 넘으면 같은 transaction에서 적용 결과를 base 문서로 저장.
+    """
+    size = len(json.dumps(operations, ensure_ascii=False).encode())
+    with transaction.atomic():
+        current = (
+            Draft.objects.select_for_update()
+            .filter(pk=draft.pk, version=version)
+            .only("changes", "patches", "patch_size")
+            .first()
+        )
+        if current is None:
+            return None
+        document = apply_json_patch(draft_document(current), operations)
+
+        if current.patch_size + size > COMPACT_BYTES:
+            # compaction: 누적 patches 대신 적용 결과를 base 문서로
+            update = {
+                "changes": Value(document, models.JSONField()),
+                "patches": Value([], models.JSONField()),
+                "patch_size": 0,
+            }
+        else:
+            update = {
+                "patches": JSONBConcat(
+                    F("patches"), Value(operations, models.JSONField())
+                ),
+                "patch_size": F("patch_size") + size,
+            }
+        Draft.objects.filter(pk=draft.pk).update(
+            version=F("version") + 1, updated_at=timezone.now(), **update
+        )
+    return version + 1
+
+
+def _is_id(value):
+    # bool은 int의 subclass이므로 제외
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def validate_draft_changes(changes):
+    """
+    Draft.changes 전체를 DB 조회 2회(팀, 법인)로 메모리에서 검증하고 적용 계획을 반환.
+
+    changes 형식:
+      {
+        "corporations": [{"c_id": 1, "name": "새 법인명"}],
+        "teams": [
+          # 기존 팀: 주어진 key만 변경 (parent_id가 null이면 법인 최상위로 이동)
+          {"t_id": 10, "name": "새 팀명", "parent_id": 3, "is_active": false},
+          # 새 팀: temp_id로 구분, parent_id에는 다른 새 팀의 temp_id도 사용 가능
+          {"temp_id": "new-1", "name": "신규팀", "corporation": 1, "parent_id": 10},
+        ],
+      }
+    """
+    if not isinstance(changes, dict):
+        raise serializers.ValidationError("changes는 객체여야 합니다.")
+    corp_changes = changes.get("corporations") or []
+    team_changes = changes.get("teams") or []
+    if not isinstance(corp_changes, list) or not isinstance(team_changes, list):
+        raise serializers.ValidationError("corporations와 teams는 배열이어야 합니다.")
+    errors = []
+
+    for i, change in enumerate(corp_changes):
+        if not isinstance(change, dict) or not _is_id(change.get("c_id")):
+            errors.append(f"corporations[{i}]: 정수 c_id를 가진 객체여야 합니다.")
+        elif not isinstance(change.get("name", ""), str):
+            errors.append(f"corporations[{i}]: name은 문자열이어야 합니다.")
+    if errors:
+        raise serializers.ValidationError(errors)
+
+    updates, creates = {}, {}
+    for i, change in enumerate(team_changes):
+        if not isinstance(change, dict):
+            errors.append(f"teams[{i}]: 객체여야 합니다.")
+            continue
+        parent_id = change.get("parent_id")
+        if parent_id is not None and not (
+            _is_id(parent_id) or isinstance(parent_id, str)
+        ):
+            errors.append(
+                f"teams[{i}]: parent_id는 t_id(정수) 또는 temp_id(문자열)입니다."
+            )
+        if not isinstance(change.get("name", ""), str):
+            errors.append(f"teams[{i}]: name은 문자열이어야 합니다.")
+        if "t_id" in change:
+            if not _is_id(change["t_id"]):
+                errors.append(f"teams[{i}]: t_id는 정수여야 합니다.")
+                continue
+            if change["t_id"] in updates:
+                errors.append(f"teams[{i}]: 중복된 t_id {change['t_id']}")
+            if "is_active" in change and change["is_active"] is not False:
+                errors.append(f"teams[{i}]: is_active는 false(비활성화)만 가능합니다.")
+            updates[change["t_id"]] = change
+        elif "temp_id" in change:
+            # 정수 temp_id는 기존 t_id와 구분할 수 없으므로 문자열만 허용
+            if not isinstance(change["temp_id"], str) or not change["temp_id"]:
+                errors.append(
+                    f"teams[{i}]: temp_id는 빈 값이 아닌 문자열이어야 합니다."
+                )
+                continue
+            if change["temp_id"] in creates:
+                errors.append(f"teams[{i}]: 중복된 temp_id {change['temp_id']}")
+            if not change.get("name") or not _is_id(change.get("corporation")):
+                errors.append(f"teams[{i}]: 새 팀에는 name과 corporation이 필요합니다.")
+            creates[change["temp_id"]] = change
+        else:
+            errors.append(f"teams[{i}]: t_id 또는 temp_id가 필요합니다.")
+    if errors:
+        raise serializers.ValidationError(errors)
+
+    # 참조되는 기존 팀/법인을 한 번에 조회
+    team_ids = set(updates) | {
+        c["parent_id"] for c in team_changes if _is_id(c.get("parent_id"))
+    }
+    teams = {
+        row["t_id"]: row
+        for row in Team.objects.filter(t_id__in=team_ids).values(
+            "t_id", "name", "corporation_id", "is_active", "path"
+        )
+    }
+    corp_ids = {c.get("c_id") for c in corp_changes} | {
+        c["corporation"] for c in creates.values()
+    }
+    corporations = dict(
+        Corporation.objects.filter(c_id__in=corp_ids).values_list("c_id", "name")
+    )
+
+    for t_id in team_ids - set(teams):
+        errors.append(f"존재하지 않는 팀입니다: {t_id}")
+    for c_id in corp_ids - set(corporations):
+        errors.append(f"존재하지 않는 법인입니다: {c_id}")
+    if errors:
+        raise serializers.ValidationError(errors)
+
+    # 현재 상위 조직(path 기준)과 변경 후 상위 조직
+    current_parent = {}
+    for row in teams.values():
+        chain = [None] + row["path"] + [row["t_id"]]
+        for parent_id, t_id in zip(chain, chain[1:]):
+            current_parent.setdefault(t_id, parent_id)
+    final_parent = dict(current_parent)
+    team_corporation = {t_id: row["corporation_id"] for t_id, row in teams.items()}
+    for temp_id, change in creates.items():
+        final_parent[temp_id] = change.get("parent_id")
+        team_corporation[temp_id] = change["corporation"]
+    for t_id, change in updates.items():
+        if "parent_id" in change:
+            final_parent[t_id] = change["parent_id"]
+
+    for key, parent_id in final_parent.items():
+        if parent_id is None or key not in updates and key not in creates:
+            continue
+        if parent_id not in team_corporation:
+            errors.append(f"{key}: 알 수 없는 상위 조직입니다: {parent_id}")
+        elif team_corporation[parent_id] != team_corporation[key]:
+            errors.append(f"{key}: 다른 법인의 팀을 상위 조직으로 지정할 수 없습니다.")
+        # 변경 후 상위 조직을 따라 올라가며 순환 참조 검사
+        node, steps = parent_id, 0
+        while node is not None and steps <= len(final_parent):
+            if node == key:
+                errors.append(f"{key}: 상위 조직 변경으로 순환 구조가 생깁니다.")
+                break
+            node, steps = final_parent.get(node), steps + 1
+    if errors:
+        raise serializers.ValidationError(errors)
+
+    return {
+        "corporations": {
+            c["c_id"]: (corporations[c["c_id"]], c["name"])
+            for c in corp_changes
+            if c.get("name") and c["name"] != corporations[c["c_id"]]
+        },
+        "creates": creates,
+        "renames": {
+            t_id: (teams[t_id]["name"], c["name"])
+            for t_id, c in updates.items()
+            if c.get("name") and c["name"] != teams[t_id]["name"]
+        },
+        "moves": {
+            t_id: (current_parent[t_id], c["parent_id"])
+            for t_id, c in updates.items()
+            if "parent_id" in c and c["parent_id"] != current_parent[t_id]
+        },
+        "deactivates": [
+            t_id
+            for t_id, c in updates.items()
+            if c.get("is_active") is False and teams[t_id]["is_active"]
+        ],
+        "team_corporation": team_corporation,
+    }
+
+
+def apply_draft_plan(plan, person, name=None, message=""):
+    """
+    validate_draft_changes의 결과를 하나의 commit으로 한 transaction 안에서 적용.
+    팀/상위 조직 링크/히스토리/CompanyCommitAction 모두 bulk 쿼리로 처리.
+    """
+    through = Team.parent_teams.through
+    corp_sub_teams = Corporation.sub_teams.through
+    team_corporation = plan["team_corporation"]
+
+    with transaction.atomic():
+        commit_data = {"created_by": person, "message": message}
+        if name:
+            commit_data["name"] = name
+        commit = CompanyCommit.objects.create(**commit_data)
+
+        # 새 팀 생성 후 temp_id → t_id
+        created = Team.objects.bulk_create(
+            [
+                Team(
+                    name=c["name"],
+                    corporation_id=c["corporation"],
+                    **Team.search_name_values(c["name"]),
+                )
+                for c in plan["creates"].values()
+            ]
+        )
+        temp_ids = {
+            temp_id: team.t_id for temp_id, team in zip(plan["creates"], created)
+        }
+
+        def resolve(ref):
+            return temp_ids.get(ref, ref)
+
+        corporations = {resolve(k): c_id for k, c_id in team_corporation.items()}
+
+        Corporation.objects.bulk_update(
+            [
+                Corporation(c_id=c_id, name=n, **Corporation.search_name_values(n))
+                for c_id, (_, n) in plan["corporations"].items()
+            ],
+            ["name", *Corporation.search_name_fields],
+        )
+        Team.objects.bulk_update(
+            [
+                Team(t_id=t_id, name=new, **Team.search_name_values(new))
+                for t_id, (_, new) in plan["renames"].items()
+            ],
+            ["name", *Team.search_name_fields],
+        )
+
+        # 상위 조직 링크 교체 (이동한 팀의 기존 링크 삭제 후 일괄 생성)
+        new_parents = {
+            t_id: resolve(new) for t_id, (_, new) in plan["moves"].items()
+        } | {
+            temp_ids[temp_id]: resolve(c.get("parent_id"))
+            for temp_id, c in plan["creates"].items()
+        }
+        through.objects.filter(from_team_id__in=plan["moves"]).delete()
+        through.objects.bulk_create(
+            [
+                through(from_team_id=t_id, to_team_id=parent_id)
+                for t_id, parent_id in new_parents.items()
+                if parent_id is not None
+            ]
+        )
+        # parent가 없으면 소속 corporation의 sub_teams에 추가
+        corp_sub_teams.objects.bulk_create(
+            [
+                corp_sub_teams(corporation_id=corporations[t_id], team_id=t_id)
+                for t_id, parent_id in new_parents.items()
+                if parent_id is None
+            ],
+            ignore_conflicts=True,
+        )
+        # bulk 쿼리는 m2m_changed가 발생하지 않으므로 closure/path와 권한 범위 직접 갱신
+        Team.objects.refresh_hierarchy(new_parents)
+        invalidate_all_auth_scopes()
+
+        corp_actions = [
+            CompanyCommitAction(
+                commit=commit,
+                target_type=CORPORATION,
+                action=CompanyCommitAction.CommitType.UPDATE,
+                target_id=c_id,
+                corporation_id=c_id,
+                old_name=old,
+                new_name=n,
+            )
+            for c_id, (old, n) in plan["corporations"].items()
+        ]
+        create_actions = [
+            CompanyCommitAction(
+                commit=commit,
+                target_type=TEAM,
+                action=CompanyCommitAction.CommitType.CREATE,
+                target_id=temp_ids[temp_id],
+                corporation_id=c["corporation"],
+                new_name=c["name"],
+                new_parent_id=new_parents[temp_ids[temp_id]],
+            )
+            for temp_id, c in plan["creates"].items()
+        ]
+        rename_actions = [
+            CompanyCommitAction(
+                commit=commit,
+                target_type=TEAM,
+                action=CompanyCommitAction.CommitType.UPDATE,
+                target_id=t_id,
+                corporation_id=corporations[t_id],
+                old_name=old,
+                new_name=new,
+            )
+            for t_id, (old, new) in plan["renames"].items()
+        ]
+        move_actions = [
+            CompanyCommitAction(
+                commit=commit,
+                target_type=TEAM,
+                action=CompanyCommitAction.CommitType.UPDATE,
+                target_id=t_id,
+                corporation_id=corporations[t_id],
+                old_parent_id=old,
+                new_parent_id=new_parents[t_id],
+            )
+            for t_id, (old, _) in plan["moves"].items()
+        ]
+        CorporationNameHistoryInfo.objects.bulk_create(
+            [
+                CorporationNameHistoryInfo(corporation_id=c_id, name=n, commit=commit)
+                for c_id, (_, n) in plan["corporations"].items()
+            ]
+        )
+        TeamNameHistoryInfo.objects.bulk_create(
+            [
+                TeamNameHistoryInfo(team_id=a.target_id, name=a.new_name, commit=commit)
+                for a in create_actions + rename_actions
+            ]
+        )
+        TeamParentHistoryInfo.objects.bulk_create(
+            [
+                TeamParentHistoryInfo(
+                    team_id=a.target_id, parent_team_id=a.new_parent_id, commit=commit
+                )
+                for a in create_actions + move_actions
+            ]
+        )
+        CompanyCommitAction.objects.bulk_create(
+            corp_actions + create_actions + rename_actions + move_actions
+        )
+
+        deactivated = deactivate_teams(plan["deactivates"], commit)
+        invalidate_org_cache()
+
+    return {
+        "commit_id": commit.commit_id,
+        "created": temp_ids,
+        "summary": {
+            "corporations_renamed": len(corp_actions),
+            "teams_created": len(create_actions),
+            "teams_renamed": len(rename_actions),
+            "teams_moved": len(move_actions),
+            "teams_deactivated": deactivated["teams"],
+            "roles_ended": deactivated["roles"],
+        },
+    }
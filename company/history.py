@@ -0,0 +1,377 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import (
+    Corporation,
+    Team,
+    CompanyCommit,
+    CompanyCommitAction,
+    CompanySnapshot,
+)
+from .tree import team_rows
+
+# 몇 개의 commit마다 snapshot을 남길지
+SNAPSHOT_INTERVAL = getattr(settings, "COMPANY_SNAPSHOT_INTERVAL", 50)
+
+TEAM = CompanyCommitAction.TargetType.TEAM.name
+CORPORATION = CompanyCommitAction.TargetType.CORPORATION.name
+
+
+class OrgState:
+    """
+    특정 commit 시점의 조직도. corporations/teams는 id → 속성 dict.
+      corporations: {c_id: {"name", "is_active"}}
+      teams: {t_id: {"name", "corporation", "parent", "is_active"}}
+    """
+
+    def __init__(self, corporations=None, teams=None):
+        self.corporations = corporations or {}
+        self.teams = teams or {}
+        self._children = None
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            {int(k): v for k, v in data.get("corporations", {}).items()},
+            {int(k): v for k, v in data.get("teams", {}).items()},
+        )
+
+    def to_json(self):
+        return {
+            "corporations": {str(k): v for k, v in self.corporations.items()},
+            "teams": {str(k): v for k, v in self.teams.items()},
+        }
+
+    @classmethod
+    def capture(cls):
+        """
+        현재 DB의 조직도 (법인 1회, 팀 1회 쿼리).
+        """
+        corporations = {
+            c_id: {"name": name, "is_active": is_active}
+            for c_id, name, is_active in Corporation.objects.values_list(
+                "c_id", "name", "is_active"
+            )
+        }
+        teams = {
+            row["t_id"]: {
+                "name": row["name"],
+                "corporation": row["corporation_id"],
+                "parent": row["parent_id"],
+                "is_active": row["is_active"],
+            }
+            for row in team_rows(Team.objects.all())
+        }
+        return cls(corporations, teams)
+
+    def children(self, t_id):
+        if self._children is None:
+            self._children = defaultdict(list)
+            for child_id, team in sorted(self.teams.items()):
+                self._children[team["parent"]].append(child_id)
+        return self._children.get(t_id, [])
+
+    def root_teams(self, c_id):
+        return [
+            t_id
+            for t_id, team in sorted(self.teams.items())
+            if team["corporation"] == c_id and team["parent"] not in self.teams
+        ]
+
+    def team_data(self, t_id):
+        # TeamListSerializer와 같은 형태
+        team = self.teams[t_id]
+        return {
+            "t_id": t_id,
+            "name": team["name"],
+            "corporation": team["corporation"],
+            "sub_teams": self.children(t_id),
+            "is_active": team["is_active"],
+        }
+
+    def parent_chain(self, t_id):
+        # TeamDetailSerializer.get_parent_teams와 같은 형태 (직속 상위 조직이 order 0)
+        chain = []
+        parent_id = self.teams[t_id]["parent"] if t_id in self.teams else None
+        while parent_id in self.teams and len(chain) < len(self.teams):
+            data = self.team_data(parent_id)
+            data["order"] = len(chain)
+            chain.append(data)
+            parent_id = self.teams[parent_id]["parent"]
+        return chain
+
+    def apply(self, actions):
+        """
+        CompanyCommitAction values() row들을 순서대로 재적용.
+        """
+        for a in actions:
+            target_id = a["target_id"]
+            if a["target_type"] == CORPORATION:
+                corp = self.corporations.setdefault(
+                    target_id, {"name": a["new_name"] or "", "is_active": True}
+                )
+                if a["action"] == "DELETE":
+                    corp["is_active"] = False
+                elif a["new_name"]:
+                    corp["name"] = a["new_name"]
+                continue
+
+            if a["action"] == "CREATE":
+                self.teams[target_id] = {
+                    "name": a["new_name"] or "",
+                    "corporation": a["corporation_id"],
+                    "parent": a["new_parent_id"],
+                    "is_active": True,
+                }
+                continue
+            team = self.teams.get(target_id)
+            if team is None:
+                continue
+            if a["action"] == "DELETE":
+                team["is_active"] = False
+                continue
+            if a["new_name"]:
+                team["name"] = a["new_name"]
+            # 이름만 바뀐 action은 old/new parent가 모두 비어 있음
+            if a["old_parent_id"] is not None or a["new_parent_id"] is not None:
+                team["parent"] = a["new_parent_id"]
+        self._children = None
+
+    def revert(self, actions):
+        """
+        apply의 역방향. action row들을 최신 것부터 되돌려 이전 commit 시점으로 복원.
+        (현재 DB 조직도에서 baseline snapshot을 만들 때 사용)
+        """
+        for a in actions:
+            target_id = a["target_id"]
+            if a["target_type"] == CORPORATION:
+                if a["action"] == "CREATE":
+                    self.corporations.pop(target_id, None)
+                    continue
+                corp = self.corporations.get(target_id)
+                if corp is None:
+                    continue
+                if a["action"] == "DELETE":
+                    corp["is_active"] = True
+                elif a["new_name"] and a["old_name"] is not None:
+                    corp["name"] = a["old_name"]
+                continue
+
+            if a["action"] == "CREATE":
+                self.teams.pop(target_id, None)
+                continue
+            team = self.teams.get(target_id)
+            if team is None:
+                continue
+            if a["action"] == "DELETE":
+                team["is_active"] = True
+                continue
+            if a["new_name"] and a["old_name"] is not None:
+                team["name"] = a["old_name"]
+            if a["old_parent_id"] is not None or a["new_parent_id"] is not None:
+                team["parent"] = a["old_parent_id"]
+        self._children = None
+
+
+ACTION_FIELDS = (
+    "commit_id",
+    "action",
+    "target_type",
+    "target_id",
+    "old_parent_id",
+    "new_parent_id",
+    "old_name",
+    "new_name",
+    "corporation_id",
+)
+
+
+def commit_actions(after_commit_id, until_commit_id=None, reverse=False):
+    """(after_commit_id, until_commit_id] 구간의 action을 적용 순서(reverse면 역순)로"""
+    actions = CompanyCommitAction.objects.filter(commit_id__gt=after_commit_id)
+    if until_commit_id is not None:
+        actions = actions.filter(commit_id__lte=until_commit_id)
+    ordering = ("-commit_id", "-id") if reverse else ("commit_id", "id")
+    return list(actions.order_by(*ordering).values(*ACTION_FIELDS))
+
+
+def state_as_of(commit):
+    """
+    commit 시점의 조직도: 가장 가까운 이전 snapshot + 이후 action 재적용
+    (이전 snapshot이 없으면 baseline_state). 조회 전용이며 snapshot은 만들지 않음
+    (checkpoint_previous_commit, backfill_company_snapshot command에서만 생성).
+    """
+    return replay_state(commit.commit_id)
+
+
+def replay_state(commit_id):
+    snapshot = (
+        CompanySnapshot.objects.filter(commit_id__lte=commit_id)
+        .order_by("-commit_id")
+        .first()
+    )
+    if snapshot is None:
+        # 첫 snapshot 이전의 commit (두 번째 commit이 생기기 전의 첫 commit 등):
+        # 현재 조직도에서 이후 action을 되돌려 복원
+        return baseline_state(commit_id)
+
+    state = OrgState.from_json(snapshot.state)
+    if snapshot.commit_id != commit_id:
+        state.apply(commit_actions(snapshot.commit_id, commit_id))
+    return state
+
+
+def baseline_state(commit_id):
+    """
+    현재 DB 조직도에서 commit_id 이후의 action을 모두 되돌린 commit_id 시점의 조직도.
+    action이 기록되기 전부터 있던 법인/팀을 포함하는 baseline snapshot용.
+    """
+    state = OrgState.capture()
+    state.revert(commit_actions(commit_id, reverse=True))
+    return state
+
+
+def checkpoint_previous_commit(new_commit):
+    """
+    새 commit이 생성되면 직전 commit은 더 이상 action이 추가되지 않으므로,
+      - snapshot이 하나도 없으면 (새 DB의 두 번째 commit 등) 직전 commit의 baseline snapshot을
+        현재 조직도에서 만들어 저장
+      - 마지막 snapshot 이후 SNAPSHOT_INTERVAL개 이상의 commit이 쌓였다면
+        마지막 snapshot에 action을 재적용한 결과를 직전 commit의 snapshot으로 저장
+    """
+    previous = (
+        CompanyCommit.objects.filter(commit_id__lt=new_commit.commit_id)
+        .order_by("-commit_id")
+        .values_list("commit_id", flat=True)
+        .first()
+    )
+    last_snapshot_id = (
+        CompanySnapshot.objects.order_by("-commit_id")
+        .values_list("commit_id", flat=True)
+        .first()
+    )
+    if previous is None:
+        return None
+    if last_snapshot_id is None:
+        snapshot, _ = CompanySnapshot.objects.get_or_create(
+            commit_id=previous, defaults={"state": baseline_state(previous).to_json()}
+        )
+        return snapshot
+    pending = CompanyCommit.objects.filter(
+        commit_id__gt=last_snapshot_id, commit_id__lte=previous
+    ).count()
+    if pending < SNAPSHOT_INTERVAL:
+        return None
+    snapshot, _ = CompanySnapshot.objects.get_or_create(
+        commit_id=previous, defaults={"state": replay_state(previous).to_json()}
+    )
+    return snapshot
+
+
+def commit_diff(starting_commit_id, ending_commit_id, c_id=None):
+    """
+    starting_commit 이후 ending_commit까지의 순(net) 구조 변경.
+    action을 commit 순서대로 한 번만 훑으며 대상별 최초/최종 값만 남겨
+    중간 변경(생성 후 삭제, 이름을 바꿨다 되돌림 등)은 제거.
+    commit은 변경되지 않으므로 ending_commit이 최신이 아니면 결과를 cache.
+    """
+    # v2: removed/renamed 항목에 시작 시점 이름을 채우도록 바뀐 결과
+    cache_key = f"company:commit-diff:v2:{starting_commit_id}:{ending_commit_id}:{c_id}"
+    diff = cache.get(cache_key)
+    if diff is not None:
+        return diff
+
+    actions = CompanyCommitAction.objects.filter(
+        commit_id__gt=starting_commit_id, commit_id__lte=ending_commit_id
+    )
+    if c_id:
+        actions = actions.filter(corporation_id=c_id)
+
+    targets = {}
+    for a in actions.order_by("commit_id", "id").values(
+        "action",
+        "target_type",
+        "target_id",
+        "old_parent_id",
+        "new_parent_id",
+        "old_name",
+        "new_name",
+    ):
+        entry = targets.setdefault(
+            (a["target_type"], a["target_id"]),
+            {"created": False, "deleted": False, "name": {}, "parent": {}},
+        )
+        if a["action"] == "CREATE":
+            entry["created"] = True
+            entry["deleted"] = False
+            entry["name"]["new"] = a["new_name"]
+            entry["parent"]["new"] = a["new_parent_id"]
+        elif a["action"] == "DELETE":
+            entry["deleted"] = True
+        else:
+            if a["new_name"]:
+                entry["name"].setdefault("old", a["old_name"])
+                entry["name"]["new"] = a["new_name"]
+            if a["old_parent_id"] is not None or a["new_parent_id"] is not None:
+                entry["parent"].setdefault("old", a["old_parent_id"])
+                entry["parent"]["new"] = a["new_parent_id"]
+
+    diff = {
+        "starting_commit_id": starting_commit_id,
+        "ending_commit_id": ending_commit_id,
+        "added": [],
+        "removed": [],
+        "renamed": [],
+        "reparented": [],
+    }
+    start_state = None
+
+    def start_name(target_type, target_id):
+        # 구간 안에서 이름이 바뀌지 않았거나 old_name이 없는 action이면 시작 시점 조직도의 이름
+        nonlocal start_state
+        if start_state is None:
+            start_state = replay_state(starting_commit_id)
+        items = (
+            start_state.corporations
+            if target_type == CORPORATION
+            else start_state.teams
+        )
+        return items.get(target_id, {}).get("name")
+
+    for (target_type, target_id), entry in targets.items():
+        target = {"target_type": target_type, "target_id": target_id}
+        name, parent = entry["name"], entry["parent"]
+        if entry["created"]:
+            # 구간 안에서 생성 후 삭제된 대상은 결과에 포함하지 않음
+            if not entry["deleted"]:
+                diff["added"].append(
+                    {**target, "name": name.get("new"), "parent_id": parent.get("new")}
+                )
+        elif entry["deleted"]:
+            diff["removed"].append(
+                {
+                    **target,
+                    "name": name.get("old") or start_name(target_type, target_id),
+                }
+            )
+        else:
+            if "new" in name:
+                old_name = name.get("old") or start_name(target_type, target_id)
+                if old_name != name["new"]:
+                    diff["renamed"].append(
+                        {**target, "old_name": old_name, "new_name": name["new"]}
+                    )
+            if "new" in parent and parent["old"] != parent["new"]:
+                diff["reparented"].append(
+                    {
+                        **target,
+                        "old_parent_id": parent["old"],
+                        "new_parent_id": parent["new"],
+                    }
+                )
+
+    if CompanyCommit.objects.filter(commit_id__gt=ending_commit_id).exists():
+        cache.set(cache_key, diff, timeout=None)
+    return diff
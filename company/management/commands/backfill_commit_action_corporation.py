@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+
+from company.models import CompanyCommitAction, Corporation, Team
+
+
+class Command(BaseCommand):
+    help = "corporation이 비어 있는 CompanyCommitAction에 대상 법인을 채웁니다."
+
+    def handle(self, *args, **options):
+        actions = CompanyCommitAction.objects.filter(corporation__isnull=True)
+        corporations = actions.filter(
+            target_type=CompanyCommitAction.TargetType.CORPORATION.name
+        ).update(
+            corporation_id=Subquery(
+                Corporation.objects.filter(c_id=OuterRef("target_id")).values("c_id")
+            )
+        )
+        teams = actions.filter(
+            target_type=CompanyCommitAction.TargetType.TEAM.name
+        ).update(
+            corporation_id=Subquery(
+                Team.objects.filter(t_id=OuterRef("target_id")).values(
+                    "corporation_id"
+                )
+            )
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"commit actions updated: {corporations} corporation, {teams} team"
+            )
+        )
@@ -0,0 +1,55 @@
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from company.history import (
+    SNAPSHOT_INTERVAL,
+    baseline_state,
+    commit_actions,
+)
+from company.models import CompanyCommit, CompanySnapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "첫 commit 시점의 baseline snapshot(현재 조직도에서 이후 action을 되돌린 결과)과 "
+        "SNAPSHOT_INTERVAL개 commit마다의 snapshot을 다시 생성합니다."
+    )
+
+    def handle(self, *args, **options):
+        commit_ids = list(
+            CompanyCommit.objects.order_by("commit_id").values_list(
+                "commit_id", flat=True
+            )
+        )
+        if len(commit_ids) < 2:
+            # 최신 commit은 snapshot으로 고정하지 않음. baseline은 다음 commit 생성 시
+            # checkpoint_previous_commit에서 자동으로 만들어짐
+            self.stdout.write("no closed commits")
+            return
+
+        first = commit_ids[0]
+        state = baseline_state(first)
+        snapshots = [CompanySnapshot(commit_id=first, state=state.to_json())]
+
+        actions = {
+            commit_id: list(rows)
+            for commit_id, rows in groupby(
+                commit_actions(first), key=lambda a: a["commit_id"]
+            )
+        }
+        # 최신 commit은 이후 action이 더 붙을 수 있으므로 snapshot으로 고정하지 않음
+        for count, commit_id in enumerate(commit_ids[1:-1], start=1):
+            state.apply(actions.get(commit_id, []))
+            if count % SNAPSHOT_INTERVAL == 0:
+                snapshots.append(
+                    CompanySnapshot(commit_id=commit_id, state=state.to_json())
+                )
+
+        with transaction.atomic():
+            CompanySnapshot.objects.all().delete()
+            CompanySnapshot.objects.bulk_create(snapshots)
+        self.stdout.write(
+            self.style.SUCCESS(f"company_snapshot rebuilt: {len(snapshots)} rows")
+        )
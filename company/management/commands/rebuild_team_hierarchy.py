@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from company.models import Team, TeamClosure
+
+
+class Command(BaseCommand):
+    help = "parent_teams 관계로부터 팀 closure table과 path를 다시 생성합니다."
+
+    def handle(self, *args, **options):
+        Team.objects.rebuild_hierarchy()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"team_closure rebuilt: {TeamClosure.objects.count()} rows"
+            )
+        )
@@ -1,10 +1,37 @@
-from django.db import models
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models, transaction
 from django.utils import timezone
 
+from search.normalize import chosung_key, normalize_search_key
 
-class Corporation(models.Model):
+
+class SearchNameMixin:
+    """
+    name에서 파생되는 검색용 field(search_name_fields)를 저장 시 함께 갱신.
+    bulk_create/bulk_update 경로는 search_name_values로 직접 채워야 함.
+    """
+
+    search_name_fields = {"search_name": normalize_search_key}
+
+    @classmethod
+    def search_name_values(cls, name):
+        return {field: func(name) for field, func in cls.search_name_fields.items()}
+
+    def save(self, *args, **kwargs):
+        for field, value in self.search_name_values(self.name).items():
+            setattr(self, field, value)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, *self.search_name_fields}
+        super().save(*args, **kwargs)
+
+
+class Corporation(SearchNameMixin, models.Model):
     c_id = models.BigAutoField(primary_key=True)
     name = models.CharField(max_length=255)
+    # 검색용 이름 (공백 제거, 소문자화)
+    search_name = models.CharField(max_length=255, default="", editable=False)
     is_active = models.BooleanField(default=True)  # 현재 존재하는 법인 여부
     is_master = models.BooleanField(default=False)  # 본사 여부
 
@@ -28,11 +55,131 @@ class Corporation(models.Model):
 
     class Meta:
         db_table = "corporation"
+        indexes = [
+            GinIndex(
+                fields=["search_name"],
+                name="corporation_search_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
+
+
+class TeamManager(models.Manager):
+    """
+    TeamClosure(ancestor, descendant, depth)를 이용한 하위/상위 조직 조회.
+    team 인자로는 Team 인스턴스, t_id 또는 Team queryset/리스트를 받을 수 있다.
+    """
+
+    def _closure_lookup(self, link, team):
+        if isinstance(team, (models.QuerySet, list, tuple, set)):
+            return {f"{link}__in": team}
+        return {link: team}
+
+    def descendants_of(self, team, include_self=True, max_depth=None):
+        lookup = self._closure_lookup("ancestor_links__ancestor", team)
+        if not include_self:
+            lookup["ancestor_links__depth__gt"] = 0
+        if max_depth is not None:
+            lookup["ancestor_links__depth__lte"] = max_depth
+        qs = self.filter(**lookup)
+        if "ancestor_links__ancestor__in" in lookup:
+            qs = qs.distinct()
+        return qs
+
+    def ancestors_of(self, team, include_self=False):
+        lookup = self._closure_lookup("descendant_links__descendant", team)
+        if not include_self:
+            lookup["descendant_links__depth__gt"] = 0
+        qs = self.filter(**lookup)
+        if "descendant_links__descendant__in" in lookup:
+            return qs.distinct()
+        # 가까운 상위 조직부터 정렬
+        return qs.order_by("descendant_links__depth")
+
+    def refresh_hierarchy(self, team_ids):
+        """
+        parent_teams가 변경된 팀(team_ids)과 그 하위 조직의 closure row와 path를 다시 계산.
+        """
+        team_ids = set(team_ids)
+        if not team_ids:
+            return
+        affected = team_ids | set(
+            TeamClosure.objects.filter(ancestor_id__in=team_ids).values_list(
+                "descendant_id", flat=True
+            )
+        )
+        self._rebuild_closure(affected)
+
+    def rebuild_hierarchy(self):
+        """
+        모든 팀의 closure table과 path를 처음부터 다시 구성 (초기 데이터 이관용).
+        """
+        self._rebuild_closure(set(self.values_list("t_id", flat=True)))
+
+    def _rebuild_closure(self, affected):
+        through = Team.parent_teams.through
+        parents = {t_id: [] for t_id in affected}
+        for child_id, parent_id in through.objects.filter(
+            from_team_id__in=affected
+        ).values_list("from_team_id", "to_team_id"):
+            parents[child_id].append(parent_id)
+
+        # 변경 범위 밖의 상위 조직은 기존 closure와 path를 그대로 사용
+        ancestors = {}
+        outside = {p for ps in parents.values() for p in ps if p not in affected}
+        for a_id, d_id, depth in TeamClosure.objects.filter(
+            descendant_id__in=outside
+        ).values_list("ancestor_id", "descendant_id", "depth"):
+            ancestors.setdefault(d_id, {})[a_id] = depth
+        paths = dict(self.filter(t_id__in=outside).values_list("t_id", "path"))
+
+        # 상위 조직부터 순서대로 계산 (순환 참조가 있으면 해당 간선은 무시)
+        pending = set(affected)
+        while pending:
+            ready = [
+                t_id
+                for t_id in pending
+                if all(p not in pending for p in parents[t_id])
+            ] or [min(pending)]
+            for t_id in ready:
+                chain = {t_id: 0}
+                for parent_id in parents[t_id]:
+                    for a_id, depth in ancestors.get(parent_id, {}).items():
+                        if a_id != t_id and depth + 1 < chain.get(a_id, depth + 2):
+                            chain[a_id] = depth + 1
+                ancestors[t_id] = chain
+                # path는 parent_teams.first()와 같이 가장 작은 t_id의 상위 조직을 따름
+                if parents[t_id]:
+                    parent_id = min(parents[t_id])
+                    paths[t_id] = [
+                        a_id for a_id in paths.get(parent_id, []) if a_id != t_id
+                    ] + [parent_id]
+                else:
+                    paths[t_id] = []
+                pending.discard(t_id)
+
+        with transaction.atomic():
+            TeamClosure.objects.filter(descendant_id__in=affected).delete()
+            TeamClosure.objects.bulk_create(
+                [
+                    TeamClosure(ancestor_id=a_id, descendant_id=t_id, depth=depth)
+                    for t_id in affected
+                    for a_id, depth in ancestors[t_id].items()
+                ]
+            )
+            self.bulk_update(
+                [Team(t_id=t_id, path=paths[t_id]) for t_id in affected],
+                ["path"],
+                batch_size=500,
+            )
 
 
-class Team(models.Model):
+class Team(SearchNameMixin, models.Model):
     t_id = models.BigAutoField(primary_key=True)
     name = models.CharField(max_length=255)
+    # 검색용 이름 (공백 제거, 소문자화)과 초성 key ('개발팀' → 'ㄱㅂㅌ')
+    search_name = models.CharField(max_length=255, default="", editable=False)
+    name_chosung = models.CharField(max_length=255, default="", editable=False)
     is_active = models.BooleanField(default=True)
 
     corporation = models.ForeignKey(
@@ -49,6 +196,8 @@ class Team(models.Model):
     parent_teams = models.ManyToManyField(
         "self", related_name="lower_teams", symmetrical=False, blank=True
     )
+    # 최상위 조직부터 직속 상위 조직까지의 t_id 목록 (parent_teams 변경 시 동기화)
+    path = ArrayField(models.BigIntegerField(), default=list, blank=True)
 
     # 문자열 참조 사용
     members = models.ManyToManyField(
@@ -70,8 +219,53 @@ class Team(models.Model):
         "company.CompanyCommit", on_delete=models.SET_NULL, null=True, blank=True
     )
 
+    objects = TeamManager()
+
+    search_name_fields = {
+        "search_name": normalize_search_key,
+        "name_chosung": chosung_key,
+    }
+
     class Meta:
         db_table = "team"
+        indexes = [
+            GinIndex(
+                fields=["search_name"],
+                name="team_search_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(
+                fields=["name_chosung"],
+                name="team_chosung_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
+
+
+class TeamClosure(models.Model):
+    """
+    팀 계층 구조의 closure table. parent_teams 변경 시 company.signals에서 동기화.
+    (ancestor, ancestor, 0) 형태의 자기 자신 row도 포함.
+    """
+
+    ancestor = models.ForeignKey(
+        Team, on_delete=models.CASCADE, related_name="descendant_links"
+    )
+    descendant = models.ForeignKey(
+        Team, on_delete=models.CASCADE, related_name="ancestor_links"
+    )
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        db_table = "team_closure"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ancestor", "descendant"], name="team_closure_unique_pair"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["descendant", "depth"], name="team_closure_desc_idx"),
+        ]
 
 
 class Role(models.Model):
@@ -196,11 +390,47 @@ class CompanyCommitAction(models.Model):
     target_id = models.BigIntegerField(null=True, blank=True)
     old_name = models.CharField(max_length=255, null=True, blank=True)
     new_name = models.CharField(max_length=255, null=True, blank=True)
+    # 대상 법인 (팀이면 팀의 소속 법인) - 법인별 commit 조회용 비정규화 컬럼
+    corporation = models.ForeignKey(
+        Corporation,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="commit_actions",
+        db_index=False,
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = "company_commit_action"
+        indexes = [
+            models.Index(
+                fields=["corporation", "commit"], name="commit_action_corp_idx"
+            ),
+            models.Index(
+                fields=["target_type", "target_id"], name="commit_action_target_idx"
+            ),
+        ]
+
+
+class CompanySnapshot(models.Model):
+    """
+    commit 시점의 조직도(법인/팀 이름, 상위 조직, 활성 여부) checkpoint.
+    과거 시점 복원 시 가장 가까운 snapshot 이후의 CompanyCommitAction만 재적용.
+    """
+
+    commit = models.OneToOneField(
+        CompanyCommit,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="snapshot",
+    )
+    state = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "company_snapshot"
 
 
 class CorporationNameHistoryInfo(models.Model):
@@ -255,10 +485,25 @@ class Draft(models.Model):
         blank=True,
         related_name="drafts",
     )
+    updated_at = models.DateTimeField(auto_now=True)
+    # 이름이 있는 draft는 사용자별로 하나씩 upsert
+    name = models.CharField(max_length=255, default="", blank=True)
+    # base 문서. 자동저장은 patches(JSON Patch, RFC 6902)에 누적되고
+    # patch_size가 임계치를 넘으면 changes로 compaction
     changes = models.JSONField()
+    patches = models.JSONField(default=list)
+    patch_size = models.PositiveIntegerField(default=0)
+    version = models.PositiveIntegerField(default=0)
 
     class Meta:
         db_table = "draft"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["created_by", "name"],
+                condition=~models.Q(name=""),
+                name="draft_unique_name",
+            ),
+        ]
 
     def __str__(self):
         return f"Draft by {self.created_by} at {self.created_at}"
@@ -1,7 +1,123 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import CursorPagination
 from .models import *
 
 
+class KeysetCursorPagination(CursorPagination):
+    """
+    ordering의 모든 field를 cursor position으로 사용하는 CursorPagination.
+    DRF 기본 구현은 첫 field만 position으로 쓰고 같은 값은 offset으로 건너뛰지만,
+    여기서는 (a, b) > (x, y) 조건으로 필터하므로 ordering의 마지막 field가 unique하면
+    offset 없이 index만으로 다음 page를 찾는다.
+    """
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip("-")
+            if isinstance(instance, dict):
+                values.append(instance[field_name])
+            else:
+                values.append(getattr(instance, field_name))
+        return json.dumps([str(value) for value in values])
+
+    def _decode_position(self, queryset, position):
+        try:
+            raw_values = json.loads(position)
+            if not isinstance(raw_values, list) or len(raw_values) != len(
+                self.ordering
+            ):
+                raise ValueError
+            return [
+                queryset.model._meta.get_field(order.lstrip("-")).to_python(raw)
+                for order, raw in zip(self.ordering, raw_values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _keyset_filter(self, values):
+        # (f1, f2, ...) 를 사전식으로 비교: f1 > x1 or (f1 = x1 and f2 > x2) or ...
+        condition = Q()
+        equal = Q()
+        for order, value in zip(self.ordering, values):
+            field_name = order.lstrip("-")
+            if self.cursor.reverse != order.startswith("-"):
+                lookup = f"{field_name}__lt"
+            else:
+                lookup = f"{field_name}__gt"
+            condition |= equal & Q(**{lookup: value})
+            equal &= Q(**{field_name: value})
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # CursorPagination.paginate_queryset과 같고, position 필터만 ordering 전체로 적용
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(
+                *[
+                    order[1:] if order.startswith("-") else f"-{order}"
+                    for order in self.ordering
+                ]
+            )
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(
+                self._keyset_filter(self._decode_position(queryset, current_position))
+            )
+
+        results = list(queryset[offset : offset + self.page_size + 1])
+        self.page = list(results[: self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+
 class CorpListPagination(CursorPagination):
     page_size = 10
     ordering = "c_id"
@@ -10,3 +126,9 @@ class CorpListPagination(CursorPagination):
 class TeamListPagination(CursorPagination):
     page_size = 10
     ordering = "t_id"
+
+
+class CompanyCommitListPagination(KeysetCursorPagination):
+    page_size = 20
+    # commit_id가 같은 created_at의 tiebreaker
+    ordering = ("-created_at", "-commit_id")
@@ -1,25 +1,179 @@
+import time
+
+from django.conf import settings
+from django.contrib.postgres.expressions import ArraySubquery
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
 from rest_framework import permissions
 
+from person.models import Person
+from .models import Corporation, Team, TeamClosure
+
+# 사용자별 권한 범위 캐시 ((generation, scope)로 저장). 개별 무효화는 key 삭제,
+# 전체 무효화는 generation 증가
+# 모든 worker가 같은 cache를 봐야 하므로 공유 cache backend 필수 (company.checks)
+AUTH_SCOPE_GENERATION_KEY = "company:auth-scope-generation"
+AUTH_SCOPE_TIMEOUT = getattr(settings, "COMPANY_AUTH_SCOPE_TIMEOUT", 60 * 30)
+
+
+class AuthContext:
+    """
+    요청 사용자의 권한 정보. get_auth_context로 요청당 한 번만 구성됨.
+      is_master_hr: 본사(is_master) 법인의 hr_team 구성원 여부
+      hr_corp_ids: 사용자가 hr_team 구성원인 법인 c_id 집합
+      led_team_ids: 사용자가 team_leader인 팀 t_id 집합
+      led_subtree_ids: led_team_ids와 그 하위 조직 전체의 t_id 집합
+    """
+
+    def __init__(
+        self,
+        p_id=None,
+        is_master_hr=False,
+        hr_corp_ids=(),
+        led_team_ids=(),
+        led_subtree_ids=(),
+    ):
+        self.p_id = p_id
+        self.is_master_hr = is_master_hr
+        self.hr_corp_ids = frozenset(hr_corp_ids)
+        self.led_team_ids = frozenset(led_team_ids)
+        self.led_subtree_ids = frozenset(led_subtree_ids)
+
+    def person_scope_q(self, field="pk", include_owner=True, include_leaders=True):
+        """
+        (include_owner면) 본인 + 사용자가 HR인 법인의 팀원 + (include_leaders면) 사용자가 팀장인 팀과
+        그 하위 조직의 팀원을 나타내는 Q. field는 Person(또는 Person FK)을 가리키는 경로.
+        HR/팀장 여부는 하나의 EXISTS로 확인하므로 목록 queryset에도 그대로 사용 가능.
+        """
+        if self.p_id is None:
+            return Q(pk__in=[])
+        scope = Q(team__corporation_id__in=self.hr_corp_ids)
+        if include_leaders:
+            scope |= Q(team_id__in=self.led_subtree_ids)
+        managed = Team.members.through.objects.filter(scope, person_id=OuterRef(field))
+        if include_owner:
+            return Q(**{field: self.p_id}) | Exists(managed)
+        return Q(Exists(managed))
+
+    def can_access_person(self, target_person, **kwargs):
+        """대상 Person에 대한 person_scope_q 검사 (query 한 번)"""
+        return (
+            Person.objects.filter(pk=target_person.pk)
+            .filter(self.person_scope_q(**kwargs))
+            .exists()
+        )
+
+
+def _auth_scope_generation():
+    generation = cache.get(AUTH_SCOPE_GENERATION_KEY)
+    if generation is None:
+        cache.add(AUTH_SCOPE_GENERATION_KEY, int(time.time() * 1000), None)
+        generation = cache.get(AUTH_SCOPE_GENERATION_KEY)
+    return generation
+
+
+def _auth_scope_key(p_id):
+    return f"company:auth-scope:{p_id}"
+
+
+def _query_auth_scope(p_id):
+    hr_corporations = Corporation.objects.filter(hr_team__members=OuterRef("pk"))
+    return (
+        Person.objects.filter(p_id=p_id)
+        .annotate(
+            hr_corp_ids=ArraySubquery(hr_corporations.values("c_id")),
+            master_corp_ids=ArraySubquery(
+                hr_corporations.filter(is_master=True).values("c_id")
+            ),
+            led_team_ids=ArraySubquery(
+                Team.objects.filter(team_leader=OuterRef("pk")).values("t_id")
+            ),
+            # 팀장인 팀과 그 하위 조직 전체 (closure table)
+            led_subtree_ids=ArraySubquery(
+                TeamClosure.objects.filter(ancestor__team_leader=OuterRef("pk")).values(
+                    "descendant_id"
+                )
+            ),
+        )
+        .values("hr_corp_ids", "master_corp_ids", "led_team_ids", "led_subtree_ids")
+        .first()
+    )
+
+
+def get_auth_scope(p_id):
+    """
+    사용자의 권한 범위 dict. generation과 (generation, scope) entry를 한 번의 get_many로
+    읽어 현재 generation의 entry면 그대로 사용, 아니면 query 한 번으로 계산.
+    """
+    key = _auth_scope_key(p_id)
+    values = cache.get_many([AUTH_SCOPE_GENERATION_KEY, key])
+    generation = values.get(AUTH_SCOPE_GENERATION_KEY)
+    if generation is None:
+        generation = _auth_scope_generation()
+    entry = values.get(key)
+    if entry is not None and entry[0] == generation:
+        return entry[1]
+    scope = _query_auth_scope(p_id) or {}
+    cache.set(key, (generation, scope), AUTH_SCOPE_TIMEOUT)
+    return scope
+
+
+def invalidate_auth_scope(p_ids):
+    """해당 사용자들의 권한 범위 캐시를 transaction commit 이후 삭제."""
+    keys = [_auth_scope_key(p_id) for p_id in p_ids if p_id is not None]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _bump_auth_scope_generation():
+    try:
+        cache.incr(AUTH_SCOPE_GENERATION_KEY)
+    except ValueError:
+        cache.set(AUTH_SCOPE_GENERATION_KEY, int(time.time() * 1000), None)
+
+
+def invalidate_all_auth_scopes():
+    """영향받는 사용자를 특정하기 어려운 변경(조직 구조, hr_team 변경 등)에서 호출."""
+    transaction.on_commit(_bump_auth_scope_generation)
+
+
+def get_auth_context(request):
+    """요청 사용자의 AuthContext를 request에 저장 (권한 범위는 사용자별로 캐시)."""
+    context = getattr(request, "auth_context", None)
+    if context is not None:
+        return context
+
+    p_id = getattr(request.user, "person_id", None)
+    scope = get_auth_scope(p_id) if p_id is not None else {}
+    if not scope:
+        context = AuthContext()
+    else:
+        context = AuthContext(
+            p_id=p_id,
+            # p_id 5 이하는 기존과 같이 Master 권한 부여
+            is_master_hr=bool(scope["master_corp_ids"]) or p_id <= 5,
+            hr_corp_ids=scope["hr_corp_ids"],
+            led_team_ids=scope["led_team_ids"],
+            led_subtree_ids=scope["led_subtree_ids"],
+        )
+    request.auth_context = context
+    return context
+
+
+def get_target_person(obj):
+    # obj는 Person 또는 PersonalInfo 객체라고 가정
+    return obj if hasattr(obj, "p_id") else getattr(obj, "person", None)
+
 
 class IsMasterHRTeam(permissions.BasePermission):
     """
-    본사(hr팀) 권한: 요청 사용자의 person이 소속된 팀 중,
-    소속된 corporation이 is_master=True이고 해당 corporation의 hr_team에 속해 있다면 모든 권한을 허용.
+    본사(hr팀) 권한: 요청 사용자의 person이 is_master=True인 corporation의
+    hr_team에 속해 있다면 모든 권한을 허용.
     """
 
     def has_permission(self, request, view):
-        user_person = getattr(request.user, "person", None)
-        if not user_person:
-            return False
-        # 사용자가 속한 팀들을 순회하며, 본사 hr_team 소속 여부 확인
-        for team in user_person.member_of_teams.all():
-            corp = team.corporation
-            if corp and corp.is_master and corp.hr_team:
-                if user_person in corp.hr_team.members.all():
-                    return True
-        if user_person.p_id <= 5:
-            return True
-        return False
+        return get_auth_context(request).is_master_hr
 
     def has_object_permission(self, request, view, obj):
         # object-level permission도 동일하게 체크
@@ -32,22 +186,16 @@ class IsHRTeam(permissions.BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        # obj는 Person 또는 PersonalInfo 객체라고 가정
-        user_person = getattr(request.user, "person", None)
-        if not user_person:
+        context = get_auth_context(request)
+        if context.p_id is None:
             return False
 
-        # 대상 Person 결정
-        target_person = obj if hasattr(obj, "p_id") else getattr(obj, "person", None)
+        target_person = get_target_person(obj)
         if not target_person:
             return False
 
-        # 대상 Person이 속한 팀들 각각에 대해, 그 팀이 소속된 corporation의 hr_team에 요청 사용자가 속하는지 확인
-        for team in target_person.member_of_teams.all():
-            corp = team.corporation
-            if corp and corp.hr_team:
-                if user_person in corp.hr_team.members.all():
-                    return True
-        if user_person.p_id == 1:
+        if context.p_id == 1:
             return True
-        return False
+        return context.can_access_person(
+            target_person, include_owner=False, include_leaders=False
+        )
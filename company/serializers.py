@@ -12,6 +12,15 @@ from .models import (
 )
 from person.models import Person
 from django.db import transaction
+from django.db.models import F
+from .cache import invalidate_org_cache
+from .cascade import deactivate_corporation, deactivate_teams
+from .drafts import (
+    apply_draft_plan,
+    draft_document,
+    validate_draft_changes,
+    validate_patch,
+)
 from personCard.serializers import (
     RoleSupervisorHistorySerializer,
     PersonCardListSerializer,
@@ -44,32 +53,22 @@ class CorpEditUpdateSerializer(serializers.ModelSerializer):
         model = Corporation
         fields = ["name", "sub_teams", "is_active", "is_master", "hr_team"]
 
-    def deactivate_corporation_recursive(self, corp_obj):
-        from django.utils import timezone
-
-        if corp_obj.is_active:
-            corp_obj.is_active = False
-            if not corp_obj.deleted_at:
-                corp_obj.deleted_at = timezone.now()
-            corp_obj.save()
-
-            # 소속 팀들 비활성화
-            for team in corp_obj.teams.all():
-                if team.is_active:
-                    TeamEditUpdateSerializer.deactivate_team_recursive(team)
-
     def update(self, instance, validated_data):
         sub_teams = validated_data.pop("sub_teams", None)
-        old_is_active = instance.is_active
+        commit = validated_data.pop("commit", None)
+        # is_active가 False로 변경 시 법인/소속 팀 비활성화는 cascade에서 일괄 처리
+        deactivate = instance.is_active and validated_data.get("is_active") is False
+        if deactivate:
+            validated_data.pop("is_active")
 
         # 일반 필드 업데이트
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
 
-        # is_active가 False로 변경 시
-        if old_is_active and not instance.is_active:
-            self.deactivate_corporation_recursive(instance)
+        if deactivate:
+            deactivate_corporation(instance, commit)
+            instance.refresh_from_db(fields=["is_active", "deleted_at"])
 
         if sub_teams is not None:
             instance.sub_teams.set(sub_teams)
@@ -121,18 +120,23 @@ class TeamDetailSerializer(serializers.ModelSerializer):
         ]
 
     def get_parent_teams(self, obj):
+        # path(최상위 → 직속 상위)에 있는 상위 조직들을 한 번에 조회
+        parent_teams = {
+            team.t_id: team
+            for team in Team.objects.filter(t_id__in=obj.path).prefetch_related(
+                "sub_teams"
+            )
+        }
         parent_chain = []
-        current_team = obj
-        order = 0
-        # 현재 팀의 상위 체인을 모두 추적 (최상위까지)
-        while current_team.parent_teams.exists():
-            parent_team = current_team.parent_teams.first()
-            # TeamListSerializer를 통해 상세 정보를 가져오고, order 값을 추가
-            serialized = TeamListSerializer(parent_team, context=self.context).data
-            serialized["order"] = order
+        # 직속 상위 조직이 order 0
+        for t_id in reversed(obj.path):
+            if t_id not in parent_teams:
+                break
+            serialized = TeamListSerializer(
+                parent_teams[t_id], context=self.context
+            ).data
+            serialized["order"] = len(parent_chain)
             parent_chain.append(serialized)
-            current_team = parent_team
-            order += 1
         return parent_chain
 
     def get_member_count(self, obj):
@@ -194,55 +198,27 @@ class TeamEditUpdateSerializer(serializers.ModelSerializer):
         model = Team
         fields = ["name", "corporation", "sub_teams", "parent_teams", "members"]
 
-    def deactivate_team_recursive(self, team_obj):
-        """
-        팀(team_obj)과 하위 조직을 재귀적으로 비활성화,
-        그리고 진행 중인 Role(end_date가 null)을 모두 종료.
-        """
-        from django.utils import timezone
-
-        if team_obj.is_active:
-            team_obj.is_active = False
-            if not team_obj.deleted_at:
-                team_obj.deleted_at = timezone.now()
-            team_obj.save()
-
-            # 연관 Role 소프트 종료
-            for role in team_obj.roles.filter(end_date__isnull=True):
-                role.end_date = timezone.now()
-                role.save()
-
-        # 하위 팀(lower_teams)들도 동일하게 비활성화 처리
-        for child in team_obj.lower_teams.all():
-            if child.is_active:
-                self.deactivate_team_recursive(child)
-
     def update(self, instance, validated_data):
-        from django.utils import timezone
-
         # ManyToMany 필드 분리
         parent_teams_data = validated_data.pop("parent_teams", None)
         sub_teams = validated_data.pop("sub_teams", None)
         members = validated_data.pop("members", None)
+        commit = validated_data.pop("commit", None)
 
-        # 기존 is_active 값 기억
-        old_is_active = instance.is_active
+        # is_active가 False로 바뀔 때 (old_is_active=True & new_is_active=False)
+        # 하위 조직 비활성화 + Role 종료는 cascade에서 일괄 처리
+        deactivate = instance.is_active and validated_data.get("is_active") is False
+        if deactivate:
+            validated_data.pop("is_active")
 
         # 일반 필드 업데이트
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
 
-        # 만약 is_active가 False로 바뀌었을 때 (old_is_active=True & new_is_active=False)
-        new_is_active = instance.is_active
-        if old_is_active and not new_is_active:
-            # 소프트 딜리트
-            if not instance.deleted_at:
-                instance.deleted_at = timezone.now()
-            instance.save()
-
-            # 하위 조직 비활성화 + Role 종료
-            self.deactivate_team_recursive(instance)
+        if deactivate:
+            deactivate_teams(instance, commit)
+            instance.refresh_from_db(fields=["is_active", "deleted_at"])
 
         # parent_teams 업데이트
         if parent_teams_data is not None:
@@ -273,12 +249,81 @@ class EditDraftSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Draft
-        fields = ["id", "created_at", "created_by", "changes"]
+        fields = [
+            "id",
+            "name",
+            "created_at",
+            "updated_at",
+            "created_by",
+            "version",
+            "changes",
+        ]
+        read_only_fields = ["version"]
+        # 이름 중복은 create에서 upsert로 처리
+        validators = []
 
     def create(self, validated_data):
         user_person = self.context["request"].user.person
         validated_data["created_by"] = user_person
-        return super().create(validated_data)
+        if not validated_data.get("name"):
+            return super().create(validated_data)
+        # 같은 이름의 draft가 있으면 base 문서를 교체하고 patch를 비움
+        draft, created = Draft.objects.update_or_create(
+            created_by=user_person,
+            name=validated_data["name"],
+            defaults={
+                "changes": validated_data["changes"],
+                "patches": [],
+                "patch_size": 0,
+                "version": F("version") + 1,
+            },
+            create_defaults={"changes": validated_data["changes"]},
+        )
+        if not created:
+            draft.refresh_from_db()
+        return draft
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data["changes"] = draft_document(instance)
+        return data
+
+
+# 임시저장 목록 (내용 제외)
+class DraftListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Draft
+        fields = ["id", "name", "created_at", "updated_at", "version", "patch_size"]
+
+
+# 임시저장 자동저장 (JSON Patch 추가)
+class DraftPatchSerializer(serializers.Serializer):
+    version = serializers.IntegerField(min_value=0)
+    patches = serializers.JSONField()
+
+    def validate_patches(self, value):
+        return validate_patch(value)
+
+
+# 임시저장 적용
+class DraftApplySerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    message = serializers.CharField(required=False, allow_blank=True, default="")
+
+    def validate(self, attrs):
+        attrs["plan"] = validate_draft_changes(draft_document(self.context["draft"]))
+        return attrs
+
+    def save(self):
+        draft = self.context["draft"]
+        result = apply_draft_plan(
+            self.validated_data["plan"],
+            draft.created_by,
+            name=self.validated_data.get("name"),
+            message=self.validated_data["message"],
+        )
+        draft.delete()
+        return result
 
 
 # class TeamUpdateSerializer(serializers.ModelSerializer):
@@ -549,6 +594,7 @@ class RoleCreateSerializer(serializers.ModelSerializer):
                     old_leader_role.end_date = timezone.now()
                     old_leader_role.save()
 
+        invalidate_org_cache()
         return new_role
 
 
@@ -649,6 +695,7 @@ class RoleUpdateSerializer(serializers.ModelSerializer):
                 new_role.save()
 
         print(team_instance.team_leader)
+        invalidate_org_cache()
         return new_role
 
 
@@ -687,8 +734,13 @@ class RoleDetailSerializer(serializers.ModelSerializer):
 
 
 class TeamRestoreSerializer(serializers.ModelSerializer):
+    """
+    company.history.OrgState(state)로 복원한 commit 시점의 팀 정보.
+    이름/활성 여부/하위 조직/상위 조직은 state 기준, 구성원은 현재 기준.
+    """
+
     corporation = CorpDetailSerializer(read_only=True)
-    sub_teams = TeamListSerializer(many=True, read_only=True, source="lower_teams")
+    sub_teams = serializers.SerializerMethodField()
     parent_teams = serializers.SerializerMethodField()
     members = serializers.PrimaryKeyRelatedField(
         many=True, queryset=Person.objects.all()
@@ -713,72 +765,54 @@ class TeamRestoreSerializer(serializers.ModelSerializer):
         ]
 
     def __init__(self, *args, **kwargs):
-        self.commit = kwargs.pop("commit", None)
+        self.state = kwargs.pop("state")
         super().__init__(*args, **kwargs)
 
-    def get_parent_teams(self, obj):
-        parent_chain = []
-        current_team = obj
-        order = 0
-
-        while current_team.parent_teams.exists():
-            parent_history = (
-                TeamParentHistoryInfo.objects.filter(
-                    team=current_team, commit__created_at__lte=self.commit.created_at
-                )
-                .order_by("-commit__created_at")
-                .first()
-            )
-            parent_team = (
-                parent_history.parent_team
-                if parent_history
-                else current_team.parent_teams.first()
-            )
-
-            if not parent_team:
-                break
-
-            serialized = TeamListSerializer(parent_team, context=self.context).data
-            serialized["order"] = order
-            parent_chain.append(serialized)
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        team = self.state.teams.get(instance.t_id)
+        if team:
+            data["name"] = team["name"]
+            data["is_active"] = team["is_active"]
+        return data
 
-            current_team = parent_team
-            order += 1
+    def get_sub_teams(self, obj):
+        return [self.state.team_data(t_id) for t_id in self.state.children(obj.t_id)]
 
-        return parent_chain
+    def get_parent_teams(self, obj):
+        return self.state.parent_chain(obj.t_id)
 
     def get_member_count(self, obj):
         return obj.members.count()
 
 
 class CorpRestoreSerializer(serializers.ModelSerializer):
-    sub_teams = TeamListSerializer(many=True, read_only=True)
+    """
+    company.history.OrgState(state)로 복원한 commit 시점의 법인 정보.
+    """
+
+    sub_teams = serializers.SerializerMethodField()
 
     class Meta:
         model = Corporation
         fields = ["c_id", "name", "sub_teams", "hr_team", "is_active"]
 
     def __init__(self, *args, **kwargs):
-        self.commit = kwargs.pop("commit", None)
+        self.state = kwargs.pop("state")
         super().__init__(*args, **kwargs)
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-
         # 특정 commit 시점에서의 법인 이름 복원
-        if self.commit:
-            name_history = (
-                CorporationNameHistoryInfo.objects.filter(
-                    corporation=instance, commit__created_at__lte=self.commit.created_at
-                )
-                .order_by("-commit__created_at")
-                .first()
-            )
-            if name_history:
-                data["name"] = name_history.name  # 과거 이름으로 변경
-
+        corp = self.state.corporations.get(instance.c_id)
+        if corp:
+            data["name"] = corp["name"]
+            data["is_active"] = corp["is_active"]
         return data
 
+    def get_sub_teams(self, obj):
+        return [self.state.team_data(t_id) for t_id in self.state.root_teams(obj.c_id)]
+
 
 class CompanyCommitActionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -802,3 +836,19 @@ class CompanyCommitSerializer(serializers.ModelSerializer):
     class Meta:
         model = CompanyCommit
         fields = ["commit_id", "created_at", "message", "actions", "created_by", "name"]
+
+
+class CommitCreatorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Person
+        fields = ["p_id", "name"]
+
+
+# commit 목록용: 작성자는 p_id/name만 반환
+class CompanyCommitListSerializer(serializers.ModelSerializer):
+    actions = CompanyCommitActionSerializer(many=True, read_only=True)
+    created_by = CommitCreatorSerializer(read_only=True)
+
+    class Meta:
+        model = CompanyCommit
+        fields = ["commit_id", "created_at", "message", "actions", "created_by", "name"]
@@ -0,0 +1,126 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from person.models import Person
+from .cache import invalidate_org_cache, invalidate_team_members
+from .history import checkpoint_previous_commit
+from .models import CompanyCommit, Corporation, Role, Team, TeamClosure
+from .permissions import invalidate_all_auth_scopes, invalidate_auth_scope
+
+
+@receiver(post_save, sender=Team)
+def create_team_closure(sender, instance, created, raw=False, **kwargs):
+    # 새 팀은 자기 자신 row만 가진 상태로 시작, 상위 조직은 parent_teams.set()에서 반영
+    if created and not raw:
+        TeamClosure.objects.create(ancestor=instance, descendant=instance, depth=0)
+
+
+@receiver(m2m_changed, sender=Team.parent_teams.through)
+def sync_team_closure(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    team.parent_teams(정방향) 또는 parent.lower_teams(역방향) 변경 시 closure 동기화.
+    """
+    if action == "pre_clear" and reverse:
+        # 역방향 clear는 post_clear 시점에 하위 팀 목록을 알 수 없으므로 미리 저장
+        instance._cleared_lower_team_ids = list(
+            instance.lower_teams.values_list("t_id", flat=True)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        team_ids = [instance.pk]
+    elif action == "post_clear":
+        team_ids = getattr(instance, "_cleared_lower_team_ids", [])
+    else:
+        team_ids = pk_set or []
+    Team.objects.refresh_hierarchy(team_ids)
+    # 팀장의 하위 조직 범위가 바뀔 수 있음
+    invalidate_all_auth_scopes()
+
+
+@receiver(post_save, sender=CompanyCommit)
+def checkpoint_company_snapshot(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        checkpoint_previous_commit(instance)
+
+
+@receiver(post_save, sender=CompanyCommit)
+def invalidate_org_cache_on_commit(sender, instance, raw=False, **kwargs):
+    # org ETag는 org version만 사용하므로 commit 생성/수정 시에도 version 증가
+    if not raw:
+        invalidate_org_cache()
+
+
+# --- 권한 범위 캐시 무효화 ---
+@receiver(m2m_changed, sender=Team.members.through)
+def invalidate_member_auth_scope(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "post_clear" and not reverse:
+        # team.members.clear()는 제거된 사용자를 알 수 없으므로 전체 무효화
+        invalidate_all_auth_scopes()
+    elif action in ("post_add", "post_remove", "post_clear"):
+        invalidate_auth_scope([instance.pk] if reverse else pk_set or [])
+
+
+@receiver(pre_save, sender=Corporation)
+def invalidate_hr_team_auth_scope(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old = (
+        Corporation.objects.filter(pk=instance.pk)
+        .values("hr_team_id", "is_master")
+        .first()
+    )
+    if old != {"hr_team_id": instance.hr_team_id, "is_master": instance.is_master}:
+        # 이전/새 hr_team 구성원 모두 영향을 받음
+        invalidate_all_auth_scopes()
+
+
+@receiver(pre_save, sender=Team)
+def invalidate_team_leader_auth_scope(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance._state.adding:
+        invalidate_auth_scope([instance.team_leader_id])
+        return
+    old_leader_id = (
+        Team.objects.filter(pk=instance.pk)
+        .values_list("team_leader_id", flat=True)
+        .first()
+    )
+    if old_leader_id != instance.team_leader_id:
+        invalidate_auth_scope([old_leader_id, instance.team_leader_id])
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def invalidate_role_auth_scope(sender, instance, **kwargs):
+    invalidate_auth_scope([instance.person_id])
+
+
+# --- 인사카드 ETag(card_version) ---
+# 인사카드 목록/상세에는 소속 팀과 직무가 포함되므로 변경 시 해당 사람의 card_version 증가
+@receiver(m2m_changed, sender=Team.members.through)
+def bump_member_card_version(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # bump_card_version이 현재 소속 팀의 팀원 version도 무효화 (clear는 제거 전에)
+        if action in ("pre_clear", "post_add", "post_remove"):
+            Person.objects.filter(pk=instance.pk).bump_card_version()
+        if action in ("post_add", "post_remove"):
+            invalidate_team_members(pk_set or [])
+        return
+    if action == "pre_clear":
+        # post_clear 시점에는 제거된 팀원을 알 수 없으므로 미리 증가
+        Person.objects.filter(member_of_teams=instance).bump_card_version()
+    elif action in ("post_add", "post_remove") and pk_set:
+        Person.objects.filter(pk__in=pk_set).bump_card_version()
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_team_members([instance.pk])
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+def bump_role_card_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Person.objects.filter(pk=instance.person_id).bump_card_version()
@@ -1 +1,241 @@
-# Create your tests here.
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework import serializers
+
+from person.models import Person
+from . import drafts
+from .drafts import (
+    append_draft_patch,
+    apply_draft_plan,
+    draft_document,
+    validate_draft_changes,
+)
+from .history import commit_diff, state_as_of
+from .models import (
+    CompanyCommit,
+    CompanyCommitAction,
+    CompanySnapshot,
+    Corporation,
+    Draft,
+    Team,
+    TeamClosure,
+)
+
+
+class DraftApplyTests(TestCase):
+    def setUp(self):
+        self.person = Person.objects.create(employee_id="0001", name="홍길동")
+        self.corp = Corporation.objects.create(name="본사")
+        self.other_corp = Corporation.objects.create(name="자회사")
+        self.root = Team.objects.create(name="경영지원", corporation=self.corp)
+        self.child = Team.objects.create(name="인사팀", corporation=self.corp)
+        self.child.parent_teams.add(self.root)
+        self.other_team = Team.objects.create(
+            name="개발팀", corporation=self.other_corp
+        )
+
+    def apply(self, changes):
+        return apply_draft_plan(validate_draft_changes(changes), self.person)
+
+    def test_apply_creates_renames_and_moves_in_one_commit(self):
+        self.apply(
+            {
+                "corporations": [{"c_id": self.corp.c_id, "name": "새 본사"}],
+                "teams": [
+                    {"t_id": self.child.t_id, "name": "HR팀", "parent_id": "new-1"},
+                    {
+                        "temp_id": "new-1",
+                        "name": "인사본부",
+                        "corporation": self.corp.c_id,
+                        "parent_id": self.root.t_id,
+                    },
+                ],
+            }
+        )
+
+        new_team = Team.objects.get(name="인사본부")
+        self.child.refresh_from_db()
+        self.corp.refresh_from_db()
+        self.assertEqual(self.corp.name, "새 본사")
+        self.assertEqual(self.child.name, "HR팀")
+        self.assertEqual(list(self.child.parent_teams.all()), [new_team])
+        self.assertEqual(self.child.path, [self.root.t_id, new_team.t_id])
+        self.assertTrue(
+            TeamClosure.objects.filter(
+                ancestor=self.root, descendant=self.child, depth=2
+            ).exists()
+        )
+        actions = CompanyCommitAction.objects.all()
+        self.assertEqual({a.commit_id for a in actions}, {actions[0].commit_id})
+        self.assertEqual(actions.count(), 4)
+        corp_action = actions.get(
+            target_type=CompanyCommitAction.TargetType.CORPORATION.name
+        )
+        self.assertEqual(
+            (corp_action.old_name, corp_action.new_name), ("본사", "새 본사")
+        )
+
+    def test_apply_deactivates_subtree(self):
+        self.apply({"teams": [{"t_id": self.root.t_id, "is_active": False}]})
+
+        self.assertFalse(
+            Team.objects.filter(
+                t_id__in=[self.root.t_id, self.child.t_id], is_active=True
+            ).exists()
+        )
+
+    def test_cycle_is_rejected(self):
+        with self.assertRaises(serializers.ValidationError):
+            validate_draft_changes(
+                {"teams": [{"t_id": self.root.t_id, "parent_id": self.child.t_id}]}
+            )
+
+    def test_cycle_through_new_teams_is_rejected(self):
+        with self.assertRaises(serializers.ValidationError):
+            validate_draft_changes(
+                {
+                    "teams": [
+                        {
+                            "temp_id": "a",
+                            "name": "A",
+                            "corporation": self.corp.c_id,
+                            "parent_id": "b",
+                        },
+                        {
+                            "temp_id": "b",
+                            "name": "B",
+                            "corporation": self.corp.c_id,
+                            "parent_id": "a",
+                        },
+                    ]
+                }
+            )
+
+    def test_cross_corporation_parent_is_rejected(self):
+        with self.assertRaises(serializers.ValidationError):
+            validate_draft_changes(
+                {"teams": [{"t_id": self.other_team.t_id, "parent_id": self.root.t_id}]}
+            )
+        with self.assertRaises(serializers.ValidationError):
+            validate_draft_changes(
+                {
+                    "teams": [
+                        {
+                            "temp_id": "new-1",
+                            "name": "신규팀",
+                            "corporation": self.other_corp.c_id,
+                            "parent_id": self.root.t_id,
+                        }
+                    ]
+                }
+            )
+
+    def test_integer_temp_id_is_rejected(self):
+        with self.assertRaises(serializers.ValidationError):
+            validate_draft_changes(
+                {
+                    "teams": [
+                        {
+                            "temp_id": self.child.t_id,
+                            "name": "신규팀",
+                            "corporation": self.corp.c_id,
+                        }
+                    ]
+                }
+            )
+
+    def test_malformed_entries_are_rejected(self):
+        for changes in (
+            {"teams": ["new-1"]},
+            {"teams": {"t_id": self.root.t_id}},
+            {"corporations": [self.corp.c_id]},
+            {"teams": [{"t_id": self.root.t_id, "parent_id": 1.5}]},
+        ):
+            with self.subTest(changes=changes):
+                with self.assertRaises(serializers.ValidationError):
+                    validate_draft_changes(changes)
+
+
+class DraftPatchTests(TestCase):
+    def setUp(self):
+        person = Person.objects.create(employee_id="0001", name="홍길동")
+        self.draft = Draft.objects.create(
+            created_by=person, changes={"teams": [{"t_id": 1, "name": "인사팀"}]}
+        )
+
+    def test_patch_is_appended_and_version_bumped(self):
+        version = append_draft_patch(
+            self.draft, [{"op": "replace", "path": "/teams/0/name", "value": "HR"}], 0
+        )
+
+        self.draft.refresh_from_db()
+        self.assertEqual(version, 1)
+        self.assertEqual(self.draft.version, 1)
+        self.assertEqual(draft_document(self.draft)["teams"][0]["name"], "HR")
+
+    def test_unappliable_patch_is_not_stored(self):
+        for operations in (
+            [{"op": "replace", "path": "/teams/5/name", "value": "HR"}],
+            [{"op": "test", "path": "/teams/0/name", "value": "다른팀"}],
+        ):
+            with self.subTest(operations=operations):
+                with self.assertRaises(serializers.ValidationError):
+                    append_draft_patch(self.draft, operations, 0)
+
+        self.draft.refresh_from_db()
+        self.assertEqual(self.draft.version, 0)
+        self.assertEqual(self.draft.patches, [])
+
+    def test_stale_version_is_rejected(self):
+        self.assertIsNone(
+            append_draft_patch(
+                self.draft, [{"op": "add", "path": "/corporations", "value": []}], 3
+            )
+        )
+
+    def test_compaction_happens_in_the_same_update(self):
+        with mock.patch.object(drafts, "COMPACT_BYTES", 0):
+            version = append_draft_patch(
+                self.draft,
+                [{"op": "replace", "path": "/teams/0/name", "value": "HR"}],
+                0,
+            )
+
+        self.draft.refresh_from_db()
+        self.assertEqual(version, 1)
+        self.assertEqual(self.draft.patches, [])
+        self.assertEqual(self.draft.changes["teams"][0]["name"], "HR")
+
+
+class CompanySnapshotTests(TestCase):
+    def setUp(self):
+        self.corp = Corporation.objects.create(name="본사")
+        self.team = Team.objects.create(name="인사팀", corporation=self.corp)
+
+    def test_baseline_snapshot_is_created_with_the_second_commit(self):
+        first = CompanyCommit.objects.create(message="first")
+        self.assertFalse(CompanySnapshot.objects.exists())
+
+        CompanyCommit.objects.create(message="second")
+
+        snapshot = CompanySnapshot.objects.get()
+        self.assertEqual(snapshot.commit_id, first.commit_id)
+        self.assertEqual(
+            state_as_of(first).teams[self.team.t_id]["name"], self.team.name
+        )
+
+    def test_removed_team_keeps_its_name_in_diff(self):
+        first = CompanyCommit.objects.create(message="first")
+        second = CompanyCommit.objects.create(message="second")
+        CompanyCommitAction.objects.create(
+            commit=second,
+            target_type=CompanyCommitAction.TargetType.TEAM.name,
+            action=CompanyCommitAction.CommitType.DELETE,
+            target_id=self.team.t_id,
+            corporation=self.corp,
+        )
+
+        diff = commit_diff(first.commit_id, second.commit_id)
+
+        self.assertEqual(diff["removed"][0]["name"], "인사팀")
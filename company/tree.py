@@ -0,0 +1,98 @@
+from collections import defaultdict
+
+from django.db.models import OuterRef, Subquery
+
+from .models import Team
+
+
+def team_rows(teams):
+    """
+    팀 목록을 (상위 팀 id 포함) dict row로 한 번에 조회.
+    parent_id는 parent_teams.first()와 동일하게 가장 작은 t_id를 사용.
+    """
+    first_parent = (
+        Team.parent_teams.through.objects.filter(from_team_id=OuterRef("pk"))
+        .order_by("to_team_id")
+        .values("to_team_id")[:1]
+    )
+    return list(
+        teams.annotate(parent_id=Subquery(first_parent))
+        .order_by("name")
+        .values(
+            "t_id", "name", "is_active", "corporation_id", "team_leader_id", "parent_id"
+        )
+    )
+
+
+def nest_teams(rows, root_ids, depth=None):
+    """
+    flat row 목록으로부터 root_ids를 최상위로 하는 sub_teams 트리를 메모리에서 구성.
+    depth가 주어지면 root 아래 depth 단계까지만 포함 (0이면 root만).
+    """
+    by_id = {row["t_id"]: row for row in rows}
+    children = defaultdict(list)
+    for row in rows:
+        if row["parent_id"] in by_id:
+            children[row["parent_id"]].append(row)
+
+    visited = set()
+
+    def build(row, level):
+        visited.add(row["t_id"])
+        expand = depth is None or level < depth
+        return {
+            "t_id": row["t_id"],
+            "name": row["name"],
+            "is_active": row["is_active"],
+            "corporation": row["corporation_id"],
+            "team_leader": row["team_leader_id"],
+            "sub_teams": [
+                build(child, level + 1)
+                for child in children[row["t_id"]]
+                if expand and child["t_id"] not in visited
+            ],
+        }
+
+    return [build(by_id[t_id], 0) for t_id in root_ids if t_id in by_id]
+
+
+def build_corp_forest(corporations, depth=None):
+    """
+    법인 → 팀 트리 전체를 법인 1회, 팀 1회의 쿼리로 구성.
+    """
+    corps = list(
+        corporations.order_by("name").values(
+            "c_id", "name", "is_active", "is_master", "hr_team_id"
+        )
+    )
+    teams = Team.objects.filter(corporation_id__in=[c["c_id"] for c in corps])
+    if depth is not None:
+        # path 길이가 곧 최상위 조직으로부터의 단계
+        teams = teams.filter(path__len__lte=depth)
+    rows = team_rows(teams)
+    loaded = {row["t_id"] for row in rows}
+
+    roots = defaultdict(list)
+    for row in rows:
+        if row["parent_id"] not in loaded:
+            roots[row["corporation_id"]].append(row["t_id"])
+
+    return [
+        {
+            "c_id": corp["c_id"],
+            "name": corp["name"],
+            "is_active": corp["is_active"],
+            "is_master": corp["is_master"],
+            "hr_team": corp["hr_team_id"],
+            "sub_teams": nest_teams(rows, roots[corp["c_id"]], depth),
+        }
+        for corp in corps
+    ]
+
+
+def build_team_subtree(root, depth=None):
+    """
+    root 팀과 그 하위 조직을 closure table 기반 1회 쿼리로 구성.
+    """
+    rows = team_rows(Team.objects.descendants_of(root, max_depth=depth))
+    return nest_teams(rows, [root.t_id], depth)[0]
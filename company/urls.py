@@ -17,6 +17,8 @@ urlpatterns = [
         TeamUpdateAPIView.as_view(),
         name="team-update",
     ),
+    # 법인 → 팀 전체 트리 (Edit mode)
+    path("tree/", OrgTreeAPIView.as_view(), name="org-tree"),
     # 조직도 임시저장
     path("edit/draft/", EditDraftAPIView.as_view(), name="edit-draft"),
     # 조직도 임시저장 삭제
@@ -25,6 +27,18 @@ urlpatterns = [
         EditDraftDeleteAPIView.as_view(),
         name="edit-draft-delete",
     ),
+    # 조직도 임시저장 자동저장 (JSON Patch)
+    path(
+        "edit/draft/<int:d_id>/patch/",
+        EditDraftPatchAPIView.as_view(),
+        name="edit-draft-patch",
+    ),
+    # 조직도 임시저장 적용
+    path(
+        "edit/draft/<int:d_id>/apply/",
+        EditDraftApplyAPIView.as_view(),
+        name="edit-draft-apply",
+    ),
     # Commit Restore
     path(
         "restore/corp/<int:commit_id>/<int:c_id>/",
@@ -48,6 +62,7 @@ urlpatterns = [
         CompanyCommitCompareListView.as_view(),
         name="commit-compare",
     ),
+    path("commit/diff/", CompanyCommitDiffView.as_view(), name="commit-diff"),
     # ----- 인사이동 관련 -----
     # Role
     # 특정한 사람의 role 조회 (supervisor 변경 포함)
@@ -1,9 +1,12 @@
-from copy import deepcopy
+from datetime import datetime, time
 
-from django.db.models import OuterRef, Subquery
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.http import condition
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from django.db.models.aggregates import Max
 from rest_framework import status
 from django.db.models import Q
 from rest_framework.generics import (
@@ -13,8 +16,10 @@ from rest_framework.generics import (
     RetrieveAPIView,
     RetrieveUpdateAPIView,
     RetrieveDestroyAPIView,
+    GenericAPIView,
     get_object_or_404,
 )
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny
 
 from rest_condition import Or
@@ -25,6 +30,19 @@ from .models import Corporation, Team
 from .serializers import *
 from .paginations import *
 from .permissions import *
+from .cascade import deactivate_corporation, deactivate_teams
+from .drafts import append_draft_patch
+from .cache import (
+    OrgCacheMixin,
+    cached_org_payload,
+    current_commit_etag,
+    invalidate_org_cache,
+    org_etag,
+    team_etag,
+)
+from .history import commit_diff, state_as_of
+from .tree import build_corp_forest, build_team_subtree
+from personCard.serializers import prefetch_person_cards
 
 
 # --------- 조직도 관련 Views ------------
@@ -37,12 +55,12 @@ class EditListAPIView(ListAPIView):
         operation_description="List of Corporations for editing mode",
     )
     def get_queryset(self):
-        user_person = self.request.user.person
+        context = get_auth_context(self.request)
         # 만약 요청 사용자가 MasterHRTeam이면 모든 법인을, 아니라면 자신이 HR팀 구성원인 법인 반환
-        if IsMasterHRTeam().has_permission(self.request, self):
+        if context.is_master_hr:
             qs = Corporation.objects.all().order_by("name")
         else:
-            qs = Corporation.objects.filter(hr_team__members=user_person).order_by(
+            qs = Corporation.objects.filter(c_id__in=context.hr_corp_ids).order_by(
                 ("name")
             )
         return qs
@@ -60,6 +78,79 @@ class TeamEditListAPIView(ListAPIView):
     permission_classes = [Or(IsMasterHRTeam, IsHRTeam)]
 
 
+# Edit mode 조직도 전체 트리
+class OrgTreeAPIView(APIView):
+    permission_classes = [Or(IsMasterHRTeam, IsHRTeam)]
+
+    @swagger_auto_schema(
+        operation_summary="Edit mode 조직도 트리",
+        operation_description="법인 → 팀 트리 전체를 한 번에 조회 (root_t_id가 주어지면 해당 팀의 하위 트리)",
+        manual_parameters=[
+            openapi.Parameter(
+                "c_id",
+                openapi.IN_QUERY,
+                description="Corporation ID",
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            ),
+            openapi.Parameter(
+                "root_t_id",
+                openapi.IN_QUERY,
+                description="하위 트리의 최상위 Team ID",
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            ),
+            openapi.Parameter(
+                "depth",
+                openapi.IN_QUERY,
+                description="최상위 팀으로부터 포함할 단계 수 (0이면 최상위 팀만)",
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            ),
+        ],
+    )
+    def get(self, request):
+        c_id = self.get_int_param("c_id")
+        root_t_id = self.get_int_param("root_t_id")
+        depth = self.get_int_param("depth")
+
+        # EditListAPIView와 동일하게 MasterHRTeam이 아니면 자신이 HR팀 구성원인 법인만
+        context = get_auth_context(request)
+        if context.is_master_hr:
+            corporations = Corporation.objects.all()
+            scope = "all"
+        else:
+            corporations = Corporation.objects.filter(c_id__in=context.hr_corp_ids)
+            scope = ",".join(map(str, sorted(context.hr_corp_ids)))
+        if c_id is not None:
+            corporations = corporations.filter(c_id=c_id)
+
+        # 조회 가능한 법인 범위가 사용자마다 다르므로 key에 포함
+        key = f"company:tree:{c_id}:{root_t_id}:{depth}:{scope}"
+
+        def build():
+            if root_t_id is not None:
+                root = get_object_or_404(
+                    Team, t_id=root_t_id, corporation__in=corporations
+                )
+                return build_team_subtree(root, depth)
+            return build_corp_forest(corporations, depth)
+
+        return Response(cached_org_payload(key, build), status=status.HTTP_200_OK)
+
+    def get_int_param(self, name):
+        value = self.request.query_params.get(name)
+        if value in (None, ""):
+            return None
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValidationError({name: "정수여야 합니다."})
+        if value < 0:
+            raise ValidationError({name: "0 이상이어야 합니다."})
+        return value
+
+
 # 임시저장
 @swagger_auto_schema(
     operation_summary="조직도 임시저장",
@@ -68,9 +159,18 @@ class EditDraftAPIView(ListCreateAPIView):
     serializer_class = EditDraftSerializer
     permission_classes = [Or(IsMasterHRTeam, IsHRTeam)]
 
+    def get_serializer_class(self):
+        # 목록은 메타데이터만 (본문은 단건 조회)
+        if self.request.method == "GET":
+            return DraftListSerializer
+        return EditDraftSerializer
+
     def get_queryset(self):
         user_person = self.request.user.person
-        return Draft.objects.filter(created_by=user_person).order_by("created_at")
+        queryset = Draft.objects.filter(created_by=user_person).order_by("created_at")
+        if self.request.method == "GET":
+            queryset = queryset.defer("changes", "patches")
+        return queryset
 
 
 # 임시저장 삭제
@@ -88,6 +188,66 @@ class EditDraftDeleteAPIView(RetrieveDestroyAPIView):
         return Draft.objects.filter(created_by=user_person).order_by("created_at")
 
 
+# 임시저장 자동저장 (JSON Patch 누적)
+@swagger_auto_schema(
+    operation_summary="조직도 임시저장 자동저장",
+    operation_description="version이 최신이 아니면 409를 반환합니다.",
+)
+class EditDraftPatchAPIView(GenericAPIView):
+    serializer_class = DraftPatchSerializer
+    permission_classes = [Or(IsMasterHRTeam, IsHRTeam)]
+    lookup_field = "id"
+    lookup_url_kwarg = "d_id"
+
+    def get_queryset(self):
+        user_person = self.request.user.person
+        return Draft.objects.filter(created_by=user_person).only(
+            "id", "version", "patch_size"
+        )
+
+    def post(self, request, *args, **kwargs):
+        draft = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        version = append_draft_patch(
+            draft,
+            serializer.validated_data["patches"],
+            serializer.validated_data["version"],
+        )
+        if version is None:
+            return Response(
+                {
+                    "detail": "임시저장이 다른 곳에서 변경되었습니다.",
+                    "version": draft.version,
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response({"id": draft.id, "version": version})
+
+
+# 임시저장 적용 (하나의 commit으로 일괄 반영)
+@swagger_auto_schema(
+    operation_summary="조직도 임시저장 적용",
+)
+class EditDraftApplyAPIView(GenericAPIView):
+    serializer_class = DraftApplySerializer
+    permission_classes = [Or(IsMasterHRTeam, IsHRTeam)]
+    lookup_field = "id"
+    lookup_url_kwarg = "d_id"
+
+    def get_queryset(self):
+        user_person = self.request.user.person
+        return Draft.objects.filter(created_by=user_person)
+
+    def post(self, request, *args, **kwargs):
+        draft = self.get_object()
+        serializer = self.get_serializer(
+            data=request.data, context={"request": request, "draft": draft}
+        )
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save(), status=status.HTTP_201_CREATED)
+
+
 # Corporation 정보 업데이트 (Master)
 @swagger_auto_schema(
     operation_summary="Corporation 정보 업데이트 - 조직 이동/비활성화 (Master)",
@@ -100,13 +260,15 @@ class CorpUpdateAPIView(RetrieveUpdateAPIView):
     permission_classes = [IsMasterHRTeam]
 
     def perform_update(self, serializer):
+        old_name = serializer.instance.name
         new_commit = self.request.data.get("new_commit", False)
         if new_commit:
-            CompanyCommit.objects.create(created_by=self.request.user.person)
+            commit = CompanyCommit.objects.create(created_by=self.request.user.person)
         else:
             commit = CompanyCommit.objects.latest("created_at")
 
-        instance = serializer.save()
+        instance = serializer.save(commit=commit)
+        invalidate_org_cache()
         if "name" in serializer.validated_data:
             CorporationNameHistoryInfo.objects.create(
                 corporation=instance, name=instance.name, commit=commit
@@ -117,6 +279,8 @@ class CorpUpdateAPIView(RetrieveUpdateAPIView):
                     target_type="CORPORATION",
                     action="UPDATE",
                     target_id=instance.c_id,
+                    corporation=instance,
+                    old_name=old_name,
                     new_name=instance.name,
                 )
             )
@@ -143,7 +307,8 @@ class TeamUpdateAPIView(RetrieveUpdateAPIView):
         else:
             commit = CompanyCommit.objects.latest("created_at")
 
-        instance = serializer.save()
+        instance = serializer.save(commit=commit)
+        invalidate_org_cache()
         if "name" in serializer.validated_data:
             TeamNameHistoryInfo.objects.create(
                 team=instance, name=instance.name, commit=commit
@@ -154,6 +319,7 @@ class TeamUpdateAPIView(RetrieveUpdateAPIView):
                     target_type="TEAM",
                     action="UPDATE",
                     target_id=instance.t_id,
+                    corporation_id=instance.corporation_id,
                     old_name=old_name,
                     new_name=instance.name,
                 )
@@ -168,6 +334,7 @@ class TeamUpdateAPIView(RetrieveUpdateAPIView):
                     target_type="TEAM",
                     action="UPDATE",
                     target_id=instance.t_id,
+                    corporation_id=instance.corporation_id,
                     old_parent_id=old_parent.t_id if old_parent else None,
                     new_parent_id=instance.parent_teams.first().t_id
                     if instance.parent_teams.first()
@@ -241,6 +408,7 @@ class CorpCreateAPIView(CreateAPIView):
             commit = CompanyCommit.objects.latest("created_at")
 
         corporation = serializer.save()
+        invalidate_org_cache()
         CorporationNameHistoryInfo.objects.create(
             corporation=corporation, name=corporation.name, commit=commit
         )
@@ -250,6 +418,7 @@ class CorpCreateAPIView(CreateAPIView):
                 target_type="CORPORATION",
                 action="CREATE",
                 target_id=corporation.c_id,
+                corporation=corporation,
                 new_name=corporation.name,
             )
         )
@@ -259,7 +428,7 @@ class CorpCreateAPIView(CreateAPIView):
 @swagger_auto_schema(
     operation_summary="모든 Corporation List",
 )
-class CorpListAPIView(ListAPIView):
+class CorpListAPIView(OrgCacheMixin, ListAPIView):
     serializer_class = CorpListSerializer
     # pagination_class = CorpListPagination
     permission_classes = [AllowAny]
@@ -272,10 +441,11 @@ class CorpListAPIView(ListAPIView):
 
 
 # 특정 Corporation의 정보 조회
+@method_decorator(condition(etag_func=org_etag), name="get")
 @swagger_auto_schema(
     operation_summary="특정 Corporation의 정보 조회",
 )
-class CorpDetailAPIView(RetrieveAPIView):
+class CorpDetailAPIView(OrgCacheMixin, RetrieveAPIView):
     serializer_class = CorpDetailSerializer
     queryset = Corporation.objects.all()
     lookup_field = "c_id"
@@ -296,11 +466,17 @@ class CorpDeleteAPIView(RetrieveDestroyAPIView):
     def delete(self, request, *args, **kwargs):
         return super().delete(request, *args, **kwargs)
 
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        summary = self.perform_destroy(instance)
+        return Response(summary, status=status.HTTP_200_OK)
+
     def perform_destroy(self, instance):
         """
         1) instance.is_active = False, deleted_at=now() → Corporation 소프트 딜리트
         2) 해당 Corporation에 속한 모든 Team(과 하위 조직)도 Deactivate
         3) 그 팀들에 연결된 Role 모두 end_date 처리
+        → company.cascade에서 bulk UPDATE/INSERT로 한 transaction 안에서 처리
         """
         new_commit = self.request.data.get("new_commit", False)
         if new_commit:
@@ -308,38 +484,9 @@ class CorpDeleteAPIView(RetrieveDestroyAPIView):
         else:
             commit = CompanyCommit.objects.latest("created_at")
 
-        CorporationNameHistoryInfo.objects.create(
-            corporation=instance, name="", commit=commit
-        )
-
-        if instance.is_active:
-            instance.is_active = False
-            if not instance.deleted_at:
-                instance.deleted_at = timezone.now()
-            instance.save()
-            teams = instance.teams.all()
-            for team in teams:
-                self.deactivate_team_recursive(team, commit)
-            commit.actions.add(
-                CompanyCommitAction.objects.create(
-                    commit=commit,
-                    target_type="CORPORATION",
-                    action="DELETE",
-                    target_id=instance.commit_id,
-                )
-            )
-        else:
-            # instance.delete()
-            pass
-
-    def deactivate_team_recursive(self, team_obj, commit):
-        if team_obj.is_active:
-            TeamNameHistoryInfo.objects.create(team=team_obj, name="", commit=commit)
-            team_obj.is_active = False
-            team_obj.deleted_at = timezone.now()
-            team_obj.save()
-            for child_team in team_obj.lower_teams.all():
-                self.deactivate_team_recursive(child_team, commit)
+        # 이미 비활성화된 법인이면 아무 row도 변경되지 않음 (영구 삭제는 하지 않음)
+        invalidate_org_cache()
+        return deactivate_corporation(instance, commit)
 
 
 # --- Team Views ---
@@ -359,6 +506,7 @@ class TeamCreateAPIView(CreateAPIView):
             commit = CompanyCommit.objects.latest("created_at")
 
         team = serializer.save()
+        invalidate_org_cache()
         TeamNameHistoryInfo.objects.create(team=team, name=team.name, commit=commit)
         if team.parent_teams:
             TeamParentHistoryInfo.objects.create(
@@ -370,6 +518,7 @@ class TeamCreateAPIView(CreateAPIView):
                 target_type="TEAM",
                 action="CREATE",
                 target_id=team.t_id,
+                corporation_id=team.corporation_id,
                 new_name=team.name,
                 new_parent_id=team.parent_teams.first().t_id
                 if team.parent_teams.first()
@@ -382,7 +531,7 @@ class TeamCreateAPIView(CreateAPIView):
 @swagger_auto_schema(
     operation_summary="모든 Team List",
 )
-class TeamListAPIView(ListAPIView):
+class TeamListAPIView(OrgCacheMixin, ListAPIView):
     serializer_class = TeamListSerializer
     # pagination_class = TeamListPagination
     permission_classes = [AllowAny]
@@ -395,15 +544,44 @@ class TeamListAPIView(ListAPIView):
 
 
 # 특정 Team의 정보 조회
+@method_decorator(condition(etag_func=team_etag), name="get")
 @swagger_auto_schema(
     operation_summary="특정 Team의 정보 조회",
 )
-class TeamDetailAPIView(RetrieveAPIView):
+class TeamDetailAPIView(OrgCacheMixin, RetrieveAPIView):
     serializer_class = TeamDetailSerializer
-    queryset = Team.objects.all()
+    queryset = Team.objects.select_related("corporation").prefetch_related(
+        "corporation__sub_teams",
+        "lower_teams__sub_teams",
+    )
     lookup_field = "t_id"
     lookup_url_kwarg = "t_id"
     permission_classes = [AllowAny]
+    # 팀원 인사카드는 조직도 변경 없이도 바뀌므로 캐시하지 않고 요청마다 조회
+    member_fields = ("members", "member_count")
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        for field in self.member_fields:
+            serializer.fields.pop(field, None)
+        return serializer
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        members = PersonCardListSerializer(
+            prefetch_person_cards(
+                Person.objects.filter(member_of_teams=kwargs["t_id"]).order_by("p_id")
+            ),
+            many=True,
+            context=self.get_serializer_context(),
+        ).data
+        data = {**response.data, "members": members, "member_count": len(members)}
+        response.data = {
+            field: data[field]
+            for field in TeamDetailSerializer.Meta.fields
+            if field in data
+        }
+        return response
 
 
 class TeamDeleteAPIView(RetrieveDestroyAPIView):
@@ -419,52 +597,24 @@ class TeamDeleteAPIView(RetrieveDestroyAPIView):
     def delete(self, request, *args, **kwargs):
         return super().delete(request, *args, **kwargs)
 
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        summary = self.perform_destroy(instance)
+        return Response(summary, status=status.HTTP_200_OK)
+
     def perform_destroy(self, instance):
+        """
+        팀과 하위 조직 전체 비활성화 + 해당 Role end_date 처리 (company.cascade)
+        """
         new_commit = self.request.data.get("new_commit", False)
         if new_commit:
             commit = CompanyCommit.objects.create(created_by=self.request.user.person)
         else:
             commit = CompanyCommit.objects.latest("created_at")
 
-        TeamNameHistoryInfo.objects.create(team=instance, name="", commit=commit)
-        TeamParentHistoryInfo.objects.create(
-            team=instance, parent_team=None, commit=commit
-        )
-
-        if instance.is_active:
-            instance.is_active = False
-            if not instance.deleted_at:
-                instance.deleted_at = timezone.now()
-            instance.save()
-            for child_team in instance.sub_teams.all():
-                self.deactivate_subteams_recursive(child_team, commit)
-            commit.actions.add(
-                CompanyCommitAction.objects.create(
-                    commit=commit,
-                    target_type="CORPORATION",
-                    action="DELETE",
-                    target_id=instance.commit_id,
-                )
-            )
-        else:
-            # instance.delete()
-            # Do not delete permanently
-            pass
-
-    def deactivate_subteams_recursive(self, team_obj, commit):
-        """
-        하위 팀들을 재귀적으로 비활성화 + 해당 Role end_date 처리
-        """
-        if team_obj.is_active:
-            TeamNameHistoryInfo.objects.create(team=team_obj, name="", commit=commit)
-            TeamParentHistoryInfo.objects.create(
-                team=team_obj, parent_team=None, commit=commit
-            )
-            team_obj.is_active = False
-            team_obj.deleted_at = timezone.now()
-            team_obj.save()
-            for child_team in team_obj.sub_teams.all():
-                self.deactivate_subteams_recursive(child_team, commit)
+        # 이미 비활성화된 팀이면 아무 row도 변경되지 않음 (영구 삭제는 하지 않음)
+        invalidate_org_cache()
+        return deactivate_teams(instance, commit, record_parent_history=True)
 
 
 # ----- Role Views -----
@@ -488,6 +638,7 @@ class RoleDeleteAPIView(RetrieveDestroyAPIView):
         if not instance.end_date:
             instance.end_date = timezone.now()
             instance.save()
+            invalidate_org_cache()
         else:
             # 이미 delete 상태라면 실제 삭제?
             # instance.delete()
@@ -512,38 +663,8 @@ class CorpRestoreView(RetrieveAPIView):
         commit = get_object_or_404(CompanyCommit, commit_id=commit_id)
         corporation = get_object_or_404(Corporation, c_id=c_id)
 
-        name_history = (
-            CorporationNameHistoryInfo.objects.filter(
-                corporation=corporation, commit__commit_id__lte=commit.commit_id
-            )
-            .order_by("-commit__commit_id")
-            .first()
-        )
-        if name_history:
-            corporation.name = name_history.name
-
-        latest_commit_per_team = (
-            TeamParentHistoryInfo.objects.filter(
-                team=OuterRef("team"), commit__commit_id__lte=commit.commit_id
-            )
-            .values("team")
-            .annotate(max_commit_id=Max("commit__commit_id"))
-            .values("max_commit_id")
-        )
-
-        parent_history = TeamParentHistoryInfo.objects.filter(
-            commit__commit_id=Subquery(latest_commit_per_team),
-        ).distinct("team")
-
-        sub_teams = []
-        for h in parent_history.filter(parent_team=None).all():
-            if h.team.corporation.c_id == corporation.c_id and h.parent_team is None:
-                sub_teams.append(h.team.t_id)
-
-        corporation_copy = deepcopy(corporation)
-        corporation_copy.sub_teams.set(sub_teams)
-
-        serializer = self.get_serializer(corporation_copy, commit=commit)
+        # 가장 가까운 snapshot + 이후 action 재적용으로 commit 시점 조직도 복원
+        serializer = self.get_serializer(corporation, state=state_as_of(commit))
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -560,41 +681,11 @@ class TeamRestoreView(RetrieveAPIView):
         commit = get_object_or_404(CompanyCommit, commit_id=commit_id)
         team = get_object_or_404(Team, t_id=t_id)
 
-        name_history = (
-            TeamNameHistoryInfo.objects.filter(
-                team=team, commit__created_at__lte=commit.created_at
-            )
-            .order_by("-commit__commit_id")
-            .first()
-        )
-        if name_history:
-            team.name = name_history.name
-
-        latest_commit_per_team = (
-            TeamParentHistoryInfo.objects.filter(
-                team=OuterRef("team"), commit__commit_id__lte=commit.commit_id
-            )
-            .values("team")
-            .annotate(max_commit_id=Max("commit__commit_id"))
-            .values("max_commit_id")
-        )
-
-        parent_history = TeamParentHistoryInfo.objects.filter(
-            commit__commit_id=Subquery(latest_commit_per_team),
-        ).distinct("team")
-
-        sub_teams = []
-        for h in parent_history.filter(parent_team=team).all():
-            if h.parent_team and h.parent_team.t_id == team.t_id:
-                sub_teams.append(h.team.t_id)
-
-        team_copy = deepcopy(team)
-        team_copy.sub_teams.set(sub_teams)
-
-        serializer = self.get_serializer(team_copy, commit=commit)
+        serializer = self.get_serializer(team, state=state_as_of(commit))
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@method_decorator(condition(etag_func=current_commit_etag), name="get")
 class CurrentCommitView(APIView):
     permission_classes = [Or(IsMasterHRTeam, IsHRTeam)]
 
@@ -615,22 +706,14 @@ class CurrentCommitView(APIView):
         if not c_id:
             commit = CompanyCommit.objects.latest("created_at")
         else:
-            commit = (
-                CompanyCommit.objects.filter(
-                    Q(
-                        actions__target_type=CompanyCommitAction.TargetType.TEAM.name,
-                        actions__target_id__in=Team.objects.filter(
-                            corporation_id=c_id
-                        ).values("t_id"),
-                    )
-                    | Q(
-                        actions__target_type=CompanyCommitAction.TargetType.CORPORATION.name,
-                        actions__target_id=c_id,
-                    )
-                )
-                .distinct()
-                .latest("created_at")
+            # (corporation_id, commit_id) index만으로 해당 법인의 최신 commit 조회
+            commit_id = (
+                CompanyCommitAction.objects.filter(corporation_id=c_id)
+                .order_by("-commit_id")
+                .values_list("commit_id", flat=True)
+                .first()
             )
+            commit = get_object_or_404(CompanyCommit, commit_id=commit_id)
         serializer = CompanyCommitSerializer(commit)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -640,7 +723,7 @@ class UnclassifiedListAPIView(ListAPIView):
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        return (
+        return prefetch_person_cards(
             Person.objects.filter(Q(teams__isnull=True) | Q(teams__is_active=False))
             .distinct()
             .order_by("name")
@@ -654,14 +737,20 @@ class CompanyCommitUpdateView(RetrieveUpdateAPIView):
     lookup_url_kwarg = "commit_id"
     permission_classes = [IsMasterHRTeam]
 
+    def perform_update(self, serializer):
+        serializer.save()
+        # CurrentCommitView 등의 응답(ETag)이 바뀜
+        invalidate_org_cache()
+
 
 class CompanyCommitListView(ListAPIView):
-    serializer_class = CompanyCommitSerializer
+    serializer_class = CompanyCommitListSerializer
+    pagination_class = CompanyCommitListPagination
     permission_classes = [Or(IsMasterHRTeam, IsHRTeam)]
 
     @swagger_auto_schema(
         operation_summary="Commit List",
-        operation_description="List of all commits",
+        operation_description="List of commits (cursor pagination, 최신순)",
         manual_parameters=[
             openapi.Parameter(
                 "c_id",
@@ -670,31 +759,76 @@ class CompanyCommitListView(ListAPIView):
                 type=openapi.TYPE_INTEGER,
                 required=False,
             ),
+            openapi.Parameter(
+                "start_date",
+                openapi.IN_QUERY,
+                description="이 시각(또는 날짜) 이후 생성된 commit (ISO 8601)",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                "end_date",
+                openapi.IN_QUERY,
+                description="이 시각(또는 날짜) 이전 생성된 commit (ISO 8601)",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                "action",
+                openapi.IN_QUERY,
+                description="해당 종류의 action을 포함한 commit만 (CREATE/UPDATE/DELETE)",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
         ],
     )
     def get(self, request):
         return super().get(request)
 
     def get_queryset(self):
-        c_id = self.request.query_params.get("c_id")
-        if not c_id:
-            return CompanyCommit.objects.all().order_by("-created_at")
-        return (
-            CompanyCommit.objects.filter(
-                Q(
-                    actions__target_type=CompanyCommitAction.TargetType.TEAM.name,
-                    actions__target_id__in=Team.objects.filter(
-                        corporation_id=c_id
-                    ).values("t_id"),
-                )
-                | Q(
-                    actions__target_type=CompanyCommitAction.TargetType.CORPORATION.name,
-                    actions__target_id=c_id,
+        params = self.request.query_params
+        queryset = CompanyCommit.objects.select_related("created_by").prefetch_related(
+            Prefetch("actions", queryset=CompanyCommitAction.objects.order_by("id"))
+        )
+
+        start_date = self.parse_date_param("start_date")
+        if start_date:
+            queryset = queryset.filter(created_at__gte=start_date)
+        end_date = self.parse_date_param("end_date", end_of_day=True)
+        if end_date:
+            queryset = queryset.filter(created_at__lte=end_date)
+
+        action_filter = {}
+        if params.get("c_id"):
+            action_filter["corporation_id"] = params["c_id"]
+        action = params.get("action")
+        if action:
+            if action.upper() not in CompanyCommitAction.CommitType.values:
+                raise ValidationError(
+                    {"action": "CREATE, UPDATE, DELETE 중 하나여야 합니다."}
                 )
+            action_filter["action"] = action.upper()
+        if action_filter:
+            queryset = queryset.filter(
+                commit_id__in=CompanyCommitAction.objects.filter(
+                    **action_filter
+                ).values("commit_id")
             )
-            .distinct()
-            .order_by("-created_at")
-        )
+        return queryset
+
+    def parse_date_param(self, name, end_of_day=False):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                raise ValidationError({name: "ISO 8601 날짜/시각이어야 합니다."})
+            parsed = datetime.combine(day, time.max if end_of_day else time.min)
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
 
 
 @swagger_auto_schema(
@@ -732,24 +866,76 @@ class CompanyCommitCompareListView(ListAPIView):
         starting_commit_id = self.request.query_params.get("starting_commit_id")
         ending_commit_id = self.request.query_params.get("ending_commit_id")
 
-        queryset = CompanyCommit.objects.filter(
-            commit_id__gte=starting_commit_id,
-            commit_id__lte=ending_commit_id,
-        ).order_by("-created_at")
+        queryset = (
+            CompanyCommit.objects.filter(
+                commit_id__gte=starting_commit_id,
+                commit_id__lte=ending_commit_id,
+            )
+            .prefetch_related(
+                "actions",
+                Prefetch(
+                    "created_by", queryset=prefetch_person_cards(Person.objects.all())
+                ),
+            )
+            .order_by("-created_at")
+        )
 
         if c_id:
-            team_ids = Team.objects.filter(corporation_id=c_id).values_list(
-                "t_id", flat=True
-            )
             queryset = queryset.filter(
-                Q(
-                    actions__target_type=CompanyCommitAction.TargetType.TEAM.name,
-                    actions__target_id__in=team_ids,
-                )
-                | Q(
-                    actions__target_type=CompanyCommitAction.TargetType.CORPORATION.name,
-                    actions__target_id=c_id,
-                )
-            ).distinct()
+                commit_id__in=CompanyCommitAction.objects.filter(
+                    corporation_id=c_id,
+                    commit_id__gte=starting_commit_id,
+                    commit_id__lte=ending_commit_id,
+                ).values("commit_id")
+            )
 
         return queryset
+
+
+class CompanyCommitDiffView(APIView):
+    permission_classes = [Or(IsMasterHRTeam, IsHRTeam)]
+
+    @swagger_auto_schema(
+        operation_summary="Commit diff",
+        operation_description="두 commit 사이의 순(net) 구조 변경: 추가/삭제/이름 변경/상위 조직 변경된 팀과 법인",
+        manual_parameters=[
+            openapi.Parameter(
+                "c_id",
+                openapi.IN_QUERY,
+                description="Corporation ID",
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            ),
+            openapi.Parameter(
+                "starting_commit_id",
+                openapi.IN_QUERY,
+                description="기준 Commit ID (이 commit 이후의 변경부터 포함)",
+                type=openapi.TYPE_INTEGER,
+                required=True,
+            ),
+            openapi.Parameter(
+                "ending_commit_id",
+                openapi.IN_QUERY,
+                description="마지막 Commit ID",
+                type=openapi.TYPE_INTEGER,
+                required=True,
+            ),
+        ],
+    )
+    def get(self, request):
+        try:
+            c_id = int(request.query_params.get("c_id") or 0) or None
+            starting_commit_id = int(request.query_params["starting_commit_id"])
+            ending_commit_id = int(request.query_params["ending_commit_id"])
+        except (KeyError, ValueError):
+            raise ValidationError(
+                "starting_commit_id, ending_commit_id(, c_id)는 정수여야 합니다."
+            )
+        if starting_commit_id > ending_commit_id:
+            raise ValidationError(
+                "starting_commit_id는 ending_commit_id보다 클 수 없습니다."
+            )
+        return Response(
+            commit_diff(starting_commit_id, ending_commit_id, c_id),
+            status=status.HTTP_200_OK,
+        )
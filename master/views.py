@@ -1,9 +1,12 @@
+from django.db import transaction
 from rest_framework.generics import (
     CreateAPIView,
     ListAPIView,
     RetrieveUpdateDestroyAPIView,
 )
+from personCard.columns import invalidate_column_registry
 from personCard.models import PersonCardColumns
+from search.indexing import refresh_column_search_keys
 from oauth.models import EmailDomain
 from .serializers import PersonCardColumnsSerializer, EmailDomainSerializer
 from company.permissions import IsMasterHRTeam
@@ -19,6 +22,13 @@ class PersonCardColumnsCreateAPIView(CreateAPIView):
     serializer_class = PersonCardColumnsSerializer
     permission_classes = [IsMasterHRTeam]
 
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        invalidate_column_registry()
+        # 이미 p_info에 값이 있는 경우를 위해 commit 이후 이 column의 검색 key 생성
+        column_id = serializer.instance.pk
+        transaction.on_commit(lambda: refresh_column_search_keys(column_id))
+
 
 @swagger_auto_schema(
     operation_summary="인사카드 Column 리스트",
@@ -38,6 +48,17 @@ class PersonCardColumnsUpdateAPIView(RetrieveUpdateDestroyAPIView):
     permission_classes = [IsMasterHRTeam]
     lookup_field = "pk"  # 기본 primary key 사용
 
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        invalidate_column_registry()
+        # 공개 여부/이름/type이 바뀌면 검색 key 대상도 바뀌므로 commit 이후 재색인
+        column_id = serializer.instance.pk
+        transaction.on_commit(lambda: refresh_column_search_keys(column_id))
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        invalidate_column_registry()
+
 
 # EmailDomain 관련 뷰
 @swagger_auto_schema(
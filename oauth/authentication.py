@@ -0,0 +1,139 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from person.models import Person
+from .models import OauthInfo
+
+PERSON_CACHE_SIZE = getattr(settings, "OAUTH_PERSON_CACHE_SIZE", 1024)
+PERSON_CACHE_TTL = getattr(settings, "OAUTH_PERSON_CACHE_TTL", 60)
+TOKEN_STATE_TTL = getattr(settings, "OAUTH_TOKEN_STATE_TTL", 60)
+# 발급 시점의 OauthInfo.token_version을 담는 claim (없는 이전 token은 0으로 간주)
+TOKEN_VERSION_CLAIM = "tv"
+
+
+class PersonLRUCache:
+    """프로세스 내 Person row LRU 캐시 (TTL 초과 시 다시 조회)."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, p_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(p_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(p_id)
+                # 요청 중 수정이 다른 요청에 새지 않도록 복사본 반환
+                return copy.copy(entry[1])
+
+        person = Person.objects.filter(p_id=p_id).first()
+        if person is None:
+            return None
+        with self._lock:
+            self._entries[p_id] = (now + self.ttl, person)
+            self._entries.move_to_end(p_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return copy.copy(person)
+
+    def discard(self, p_id):
+        with self._lock:
+            self._entries.pop(p_id, None)
+
+
+person_cache = PersonLRUCache(PERSON_CACHE_SIZE, PERSON_CACHE_TTL)
+
+
+def _token_state_key(user_id):
+    return f"oauth:token-state:{user_id}"
+
+
+def get_token_state(user_id):
+    """
+    (is_active, token_version) 반환, 사용자가 없으면 None.
+    OauthInfo 조회 결과를 공유 cache에 TOKEN_STATE_TTL 동안 저장 (저장/삭제 시 signal로 무효화).
+    """
+    key = _token_state_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        row = (
+            OauthInfo.objects.filter(pk=user_id)
+            .values_list("is_active", "token_version")
+            .first()
+        )
+        # 없는 사용자도 cache하여 매 요청마다 조회하지 않도록
+        state = row if row is not None else ()
+        cache.set(key, state, TOKEN_STATE_TTL)
+    return state or None
+
+
+def invalidate_token_state(user_id):
+    transaction.on_commit(lambda: cache.delete(_token_state_key(user_id)))
+
+
+def revoke_user_tokens(user_id):
+    """
+    해당 사용자에게 지금까지 발급된 모든 token을 무효화 (token_version 증가).
+    발급 시각이 아닌 version으로 비교하므로 같은 초에 다시 로그인해도 새 token은 유효.
+    """
+    OauthInfo.objects.filter(pk=user_id).update(token_version=F("token_version") + 1)
+    invalidate_token_state(user_id)
+
+
+def is_token_revoked(validated_token, token_version):
+    return validated_token.get(TOKEN_VERSION_CLAIM, 0) != token_version
+
+
+class PersonTokenUser(TokenUser):
+    """
+    token claim(user_id, p_id)만으로 만든 사용자 객체. OauthInfo row는 조회하지 않으며
+    person은 처음 접근할 때 PersonLRUCache에서 가져온다.
+    """
+
+    @cached_property
+    def person_id(self):
+        return self.token.get("p_id")
+
+    @cached_property
+    def person(self):
+        if self.person_id is None:
+            return None
+        return person_cache.get(self.person_id)
+
+
+class PersonJWTAuthentication(JWTAuthentication):
+    """
+    p_id claim이 있는 token은 사용자 상태(get_token_state, 공유 cache)만 확인하여 인증하고,
+    비활성 사용자나 revoke_user_tokens로 무효화된 token은 거부.
+    p_id claim이 없는 이전 token은 기존처럼 OauthInfo 조회.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        state = get_token_state(validated_token[api_settings.USER_ID_CLAIM])
+        if state is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        is_active, token_version = state
+        if not is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if is_token_revoked(validated_token, token_version):
+            raise AuthenticationFailed("Token has been revoked", code="token_revoked")
+        if "p_id" not in validated_token:
+            return super().get_user(validated_token)
+        return PersonTokenUser(validated_token)
@@ -10,6 +10,8 @@ class OauthInfo(AbstractUser):
     oauth_provider = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # token의 tv claim과 같아야 유효. 로그아웃 등에서 revoke_user_tokens로 증가
+    token_version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.email
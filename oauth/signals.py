@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from person.models import Person
+from .authentication import invalidate_token_state, person_cache
+from .models import OauthInfo
+
+
+@receiver(post_save, sender=OauthInfo)
+@receiver(post_delete, sender=OauthInfo)
+def invalidate_cached_token_state(sender, instance, raw=False, **kwargs):
+    # 비활성화/삭제가 token 인증에 바로 반영되도록 cache된 사용자 상태 삭제
+    if not raw:
+        invalidate_token_state(instance.pk)
+
+
+@receiver(post_save, sender=Person)
+def discard_cached_person(sender, instance, **kwargs):
+    # 다른 프로세스의 캐시는 OAUTH_PERSON_CACHE_TTL 이후 갱신됨
+    person_cache.discard(instance.pk)
@@ -7,6 +7,7 @@ from person.models import Person, PersonalInfo
 from company.serializers import ActiveRoleSerializer
 
 from django.conf import settings
+from oauth.authentication import TOKEN_VERSION_CLAIM, revoke_user_tokens
 from oauth.models import OauthInfo, EmailDomain
 from rest_framework import status
 from rest_framework.response import Response
@@ -107,6 +108,9 @@ class GoogleLoginCallback(APIView):
             )
 
         refresh = RefreshToken.for_user(user)
+        # 인증 시 OauthInfo/Person 조회 없이 person을 찾을 수 있도록 p_id claim 추가
+        refresh["p_id"] = person.p_id
+        refresh[TOKEN_VERSION_CLAIM] = user.token_version
         access_token = str(refresh.access_token)
 
         roles_serialized = ActiveRoleSerializer(
@@ -151,7 +155,12 @@ class TokenRefresh(APIView):
 
 class TokenBlacklist(TokenBlacklistView):
     permission_classes = [IsAuthenticated]
-    pass
+
+    def post(self, request, *args, **kwargs):
+        response = super().post(request, *args, **kwargs)
+        # 이미 발급된 access token도 더 이상 사용할 수 없도록
+        revoke_user_tokens(request.user.id)
+        return response
 
 
 class LoginPage(View):
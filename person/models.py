@@ -1,3 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex
+
+from company.cache import invalidate_team_members
 from company.models import *
 
 
@@ -28,6 +31,22 @@ class PersonalInfo(models.Model):
 
     class Meta:
         db_table = "personal_info"
+        indexes = [
+            # 공개 정보 key 존재(?)/포함(@>) 검색용
+            GinIndex(fields=["p_info"], name="personal_info_p_info_gin"),
+        ]
+
+
+class PersonQuerySet(models.QuerySet):
+    def bump_card_version(self):
+        # 인사카드 ETag용 변경 counter 증가 (signal이 발생하지 않는 bulk 경로에서도 호출)
+        # 팀원 카드가 포함된 팀 상세 ETag도 바뀌도록 소속 팀의 팀원 version 무효화
+        invalidate_team_members(
+            Team.members.through.objects.filter(
+                person_id__in=self.values("pk")
+            ).values_list("team_id", flat=True)
+        )
+        return self.update(card_version=models.F("card_version") + 1)
 
 
 class Person(models.Model):
@@ -47,6 +66,11 @@ class Person(models.Model):
 
     # roles = models.JSONField(null=True, blank=True) # 내부 구조: {{"t_id": "", "role": "부서원"}, {"t_id": "", "role":""},...}
 
+    # 인사카드(이름/개인정보)가 바뀔 때마다 증가, ETag에 사용
+    card_version = models.PositiveIntegerField(default=0)
+
+    objects = PersonQuerySet.as_manager()
+
     class Meta:
         db_table = "person"
         app_label = "person"
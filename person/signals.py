@@ -0,0 +1,31 @@
+from django.db.models import F
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from company.cache import invalidate_team_members
+from company.models import Team
+from .models import Person, PersonalInfo, PersonCardInfo
+
+
+@receiver(pre_save, sender=Person)
+def bump_person_card_version(sender, instance, raw=False, **kwargs):
+    # 메모리의 값이 오래되었을 수 있으므로 DB 값 기준으로 증가
+    if not raw and not instance._state.adding:
+        instance.card_version = F("card_version") + 1
+        invalidate_team_members(
+            Team.members.through.objects.filter(person_id=instance.pk).values_list(
+                "team_id", flat=True
+            )
+        )
+
+
+@receiver(post_save, sender=PersonalInfo)
+def bump_card_version_on_personal_info(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Person.objects.filter(personal_info=instance).bump_card_version()
+
+
+@receiver(post_save, sender=PersonCardInfo)
+def bump_card_version_on_card_info(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Person.objects.filter(personal_info__p_card_info=instance).bump_card_version()
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PersoncardConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "personCard"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,100 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import PersonCardColumns
+
+# master의 column 변경 시 증가. 다른 프로세스의 registry도 이 값(공유 cache)으로 갱신 여부를 판단
+COLUMNS_VERSION_KEY = "personCard:columns-version"
+# version key가 cache에서 밀려나 변경을 놓치더라도 이 시간(초)이 지나면 다시 읽음
+REGISTRY_TTL = getattr(settings, "PERSONCARD_COLUMN_REGISTRY_TTL", 60)
+# 공유 cache의 version은 이 간격(초)마다 한 번만 확인 (한 요청 안의 여러 호출은 cache를 읽지 않음)
+VERSION_CHECK_INTERVAL = getattr(
+    settings, "PERSONCARD_COLUMN_VERSION_CHECK_INTERVAL", 1
+)
+
+
+class ColumnRegistry:
+    """
+    PersonCardColumns 전체를 메모리에 올려둔 조회용 registry.
+    by_name/by_id 외에 공개/비공개, 변경 허가 필요 column 이름을 미리 계산해 둔다.
+    """
+
+    def __init__(self, columns, version=None):
+        self.version = version
+        self.loaded_at = self.checked_at = time.monotonic()
+        self.by_name = {column.column_name: column for column in columns}
+        self.by_id = {column.pk: column for column in columns}
+        self.public_names = frozenset(
+            name for name, column in self.by_name.items() if column.is_public
+        )
+        self.private_names = frozenset(self.by_name) - self.public_names
+        self.permission_required_names = frozenset(
+            name for name, column in self.by_name.items() if column.permission_required
+        )
+        self.supporting_material_required_names = frozenset(
+            name
+            for name, column in self.by_name.items()
+            if column.is_supporting_material_required
+        )
+
+    def get(self, column_name):
+        return self.by_name.get(column_name)
+
+    def requires_permission(self, column_name):
+        return column_name in self.permission_required_names
+
+
+_registry = None
+_lock = threading.Lock()
+
+
+def _is_fresh(registry, version):
+    return (
+        registry is not None
+        and registry.version == version
+        and time.monotonic() - registry.loaded_at < REGISTRY_TTL
+    )
+
+
+def get_column_registry():
+    """
+    현재 registry를 반환. column이 바뀌었거나 REGISTRY_TTL이 지난 경우에만 DB에서 다시 읽음.
+    version은 VERSION_CHECK_INTERVAL마다 한 번만 공유 cache에서 확인.
+    """
+    global _registry
+    registry = _registry
+    now = time.monotonic()
+    if (
+        registry is not None
+        and now - registry.checked_at < VERSION_CHECK_INTERVAL
+        and now - registry.loaded_at < REGISTRY_TTL
+    ):
+        return registry
+    version = cache.get(COLUMNS_VERSION_KEY, 0)
+    if _is_fresh(registry, version):
+        registry.checked_at = now
+        return registry
+    with _lock:
+        if not _is_fresh(_registry, version):
+            _registry = ColumnRegistry(list(PersonCardColumns.objects.all()), version)
+        return _registry
+
+
+def _bump_columns_version():
+    try:
+        cache.incr(COLUMNS_VERSION_KEY)
+    except ValueError:
+        # cache가 비워진 경우 이전 값과 겹치지 않도록 시간 기반으로 시작
+        cache.set(COLUMNS_VERSION_KEY, int(time.time() * 1000), None)
+
+
+def invalidate_column_registry():
+    """master의 column 생성/수정/삭제 후 호출. 다른 프로세스에는 transaction commit 이후 반영."""
+    global _registry
+    transaction.on_commit(_bump_columns_version)
+    with _lock:
+        _registry = None
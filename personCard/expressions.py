@@ -0,0 +1,21 @@
+from django.db.models import Func, JSONField, Value
+from django.db.models.functions import Cast, Coalesce
+
+
+class JSONBMerge(Func):
+    """
+    COALESCE(column, '{}') || values
+    최상위 key 단위로 values만 덮어쓰는 jsonb 병합. 나머지 key는 DB의 현재 값을 유지하므로
+    문서 전체를 다시 쓰지 않고 동시에 다른 key를 수정해도 유실되지 않는다.
+    """
+
+    arg_joiner = " || "
+    template = "%(expressions)s"
+    output_field = JSONField()
+
+    def __init__(self, expression, values, **extra):
+        super().__init__(
+            Coalesce(expression, Value({}, JSONField()), output_field=JSONField()),
+            Cast(Value(values, JSONField()), JSONField()),
+            **extra,
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from personCard.models import PersonCardChangeRequest
+
+
+class Command(BaseCommand):
+    help = "corporation_ids가 비어 있는 PersonCardChangeRequest에 요청자의 소속 법인을 채웁니다."
+
+    def handle(self, *args, **options):
+        # 요청자의 소속 팀 전체의 법인
+        updated = PersonCardChangeRequest.objects.filter(
+            corporation_ids=[]
+        ).refresh_corporations()
+        self.stdout.write(self.style.SUCCESS(f"change requests updated: {updated}"))
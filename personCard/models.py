@@ -1,4 +1,10 @@
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
+from django.db.models import OuterRef
+
+from company.models import Team
 from person.models import Person
 
 
@@ -44,6 +50,21 @@ class PersonCardColumns(models.Model):
         return self.column_name
 
 
+class PersonCardChangeRequestQuerySet(models.QuerySet):
+    def refresh_corporations(self):
+        # 요청자의 현재 소속 팀 전체의 법인으로 검토 범위 갱신
+        return self.update(
+            corporation_ids=ArraySubquery(
+                Team.objects.filter(
+                    members=OuterRef("person_id"), corporation__isnull=False
+                )
+                .order_by("corporation_id")
+                .values("corporation_id")
+                .distinct()
+            )
+        )
+
+
 class PersonCardChangeRequest(models.Model):
     STATUS_CHOICES = (
         ("pending", "Pending"),
@@ -72,9 +93,26 @@ class PersonCardChangeRequest(models.Model):
     )
     # 증빙자료 첨부 필드 (파일이 업로드 될 경로 지정)
     supporting_material = models.CharField(null=True, blank=True)
+    # 요청자의 소속 팀 전체의 법인 c_id (HR 검토 범위, team join 없이 overlap으로 필터링)
+    # pending 요청은 소속 팀이 바뀔 때 personCard.signals에서 현재 소속 기준으로 갱신
+    corporation_ids = ArrayField(models.BigIntegerField(), default=list, blank=True)
+
+    objects = PersonCardChangeRequestQuerySet.as_manager()
 
     class Meta:
         db_table = "person_card_change_request"
+        indexes = [
+            # HR 검토함: pending 요청 중 법인(corporation_ids && hr 법인) 필터
+            GinIndex(
+                fields=["corporation_ids"],
+                condition=models.Q(status="pending"),
+                name="change_request_pending_gin",
+            ),
+            models.Index(
+                fields=["status", "requested_at", "id"],
+                name="change_request_status_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Name: {self.person.name} \nColumn: {self.column.column_name} Change Request \nStatus: {self.status}"
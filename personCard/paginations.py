@@ -1,6 +1,15 @@
 from rest_framework.pagination import CursorPagination
 
+from company.paginations import KeysetCursorPagination
+
 
 class PersonCardListPagination(CursorPagination):
     page_size = 10
     ordering = "p_id"
+
+
+class PersonCardChangeInboxPagination(KeysetCursorPagination):
+    page_size = 50
+    # status 필터와 함께 (status, requested_at, id) index로 keyset 조회
+    # cursor에 (requested_at, id)를 함께 담아 requested_at이 같은 요청도 건너뛰지 않음
+    ordering = ("requested_at", "id")
@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from company.permissions import get_auth_context, get_target_person
+
 
 class IsOwnerOrHRTeam(permissions.BasePermission):
     """
@@ -7,56 +9,38 @@ class IsOwnerOrHRTeam(permissions.BasePermission):
     """
 
     def has_object_permission(self, request, view, obj):
-        # obj는 Person 또는 PersonalInfo 객체라고 가정
-        user_person = getattr(request.user, "person", None)
-        if not user_person:
+        context = get_auth_context(request)
+        if context.p_id is None:
             return False
 
-        # 대상 Person 결정
-        target_person = obj if hasattr(obj, "p_id") else getattr(obj, "person", None)
+        target_person = get_target_person(obj)
         if not target_person:
             return False
 
         # 본인인 경우 허용
-        if user_person == target_person:
+        if context.p_id == target_person.p_id:
             return True
 
-        # 대상 Person이 속한 팀들 각각에 대해, 그 팀이 소속된 corporation의 hr_team에 요청 사용자가 속하는지 확인
-        for team in target_person.member_of_teams.all():
-            corp = team.corporation
-            if corp and corp.hr_team:
-                if user_person in corp.hr_team.members.all():
-                    return True
-
-        return False
+        return context.can_access_person(target_person, include_leaders=False)
 
 
 class IsOwnerOrHRTeamOrTeamLeader(permissions.BasePermission):
     """
-    본인 or 대상 Person이 속한 팀의 팀의 리더 or 팀의 소속 corporation의 hr_team 팀원
+    본인 or 대상 Person이 속한 팀(또는 그 상위 조직)의 리더 or 팀의 소속 corporation의 hr_team 팀원
     """
 
     def has_object_permission(self, request, view, obj):
-        user_person = getattr(request.user, "person", None)
-        if not user_person:
+        context = get_auth_context(request)
+        if context.p_id is None:
             return False
 
-        target_person = obj if hasattr(obj, "p_id") else getattr(obj, "person", None)
+        target_person = get_target_person(obj)
         if not target_person:
             return False
 
         # 본인인 경우
-        if user_person == target_person:
-            return True
-
-        # 대상 Person의 각 팀에 대해 corporation의 hr_team에 사용자가 속하는지 확인
-        for team in target_person.member_of_teams.all():
-            corp = team.corporation
-            if corp and corp.hr_team and user_person in corp.hr_team.members.all():
-                return True
-
-        # 대상 Person이 속한 팀에서 사용자가 팀 리더인 경우
-        if target_person.member_of_teams.filter(team_leader=user_person).exists():
+        if context.p_id == target_person.p_id:
             return True
 
-        return False
+        # HR팀/팀 리더(상위 조직 포함) 여부를 EXISTS 하나로 확인
+        return context.can_access_person(target_person)
@@ -1,9 +1,18 @@
+from django.db import transaction
+from django.db.models import Prefetch
 from django.utils import timezone
 from rest_framework import serializers
 from person.models import Person, PersonalInfo, PersonCardInfo
-from company.models import Role, RoleSupervisorHistory
+from company.models import Role, RoleSupervisorHistory, Team
 from .models import PersonCardChangeRequest, PersonCardColumns
+from .columns import get_column_registry
+from .expressions import JSONBMerge
 from .validators import PersonCardInfoValidator
+from search.indexing import (
+    CERTIFICATE_COLUMN,
+    refresh_search_documents,
+    refresh_search_keys,
+)
 from logging import getLogger
 
 log = getLogger(__name__)
@@ -11,7 +20,29 @@ log = getLogger(__name__)
 RESTRICTED_FIELDS = ["main_phone_number", "birthday", "name"]
 
 
+def prefetch_person_cards(queryset):
+    """
+    PersonCardListSerializer가 읽는 관계를 미리 불러온 Person queryset.
+    결과 개수와 관계없이 query 3개(person+personal_info, 소속 팀, 진행 중 Role)로 직렬화됨.
+    """
+    return queryset.select_related("personal_info").prefetch_related(
+        Prefetch(
+            "member_of_teams",
+            queryset=Team.objects.only("t_id", "corporation_id"),
+        ),
+        Prefetch(
+            "roles",
+            queryset=Role.objects.filter(end_date__isnull=True)
+            .only("r_id", "person_id", "team_id", "role_name")
+            .order_by("r_id"),
+            to_attr="active_roles",
+        ),
+    )
+
+
 class PersonCardListSerializer(serializers.ModelSerializer):
+    """prefetch_person_cards로 조회한 queryset이면 추가 query 없이 직렬화됨."""
+
     emails = serializers.SerializerMethodField()
     phone_number = serializers.CharField(
         source="personal_info.main_phone_number", required=False, allow_null=True
@@ -21,15 +52,18 @@ class PersonCardListSerializer(serializers.ModelSerializer):
     roles = serializers.SerializerMethodField()
 
     def get_corporations(self, obj):
-        return list(set(team.corporation.c_id for team in obj.member_of_teams.all()))
+        return list(set(team.corporation_id for team in obj.member_of_teams.all()))
 
     def get_teams(self, obj):
         return [team.t_id for team in obj.member_of_teams.all()]
 
     def get_roles(self, obj):
+        active_roles = getattr(obj, "active_roles", None)
+        if active_roles is None:
+            active_roles = obj.roles.filter(end_date__isnull=True)
         return [
-            {"t_id": role.team.t_id, "r_id": role.r_id, "role": role.role_name}
-            for role in obj.roles.filter(end_date__isnull=True)
+            {"t_id": role.team_id, "r_id": role.r_id, "role": role.role_name}
+            for role in active_roles
         ]
 
     class Meta:
@@ -98,6 +132,104 @@ class PersonCardDetailSerializer(serializers.ModelSerializer):
         ]
 
 
+def merge_personal_info(personal_info, fields=None, p_info=None, p_card_info=None):
+    """
+    PersonalInfo에 바뀐 값만 반영. fields는 일반 column UPDATE, p_info/p_card_info는
+    JSONBMerge로 바뀐 key만 DB에서 병합하므로 문서 전체를 다시 쓰지 않는다.
+    """
+    updates = dict(fields or {})
+    if p_info:
+        updates["p_info"] = JSONBMerge("p_info", p_info)
+    if updates:
+        PersonalInfo.objects.filter(pk=personal_info.pk).update(**updates)
+
+    if p_card_info:
+        if personal_info.p_card_info_id is None:
+            card_info = PersonCardInfo.objects.create(p_card_info=p_card_info)
+            linked = PersonalInfo.objects.filter(
+                pk=personal_info.pk, p_card_info__isnull=True
+            ).update(p_card_info=card_info)
+            if linked:
+                personal_info.p_card_info = card_info
+            else:
+                # 동시에 다른 요청이 먼저 생성한 경우 그쪽에 병합
+                card_info.delete()
+                personal_info.refresh_from_db(fields=["p_card_info"])
+        if personal_info.p_card_info_id is not None:
+            PersonCardInfo.objects.filter(pk=personal_info.p_card_info_id).update(
+                p_card_info=JSONBMerge("p_card_info", p_card_info)
+            )
+
+    if updates or p_card_info:
+        # .update()는 signal이 발생하지 않으므로 ETag용 counter 직접 증가
+        Person.objects.filter(personal_info=personal_info).bump_card_version()
+    if p_info:
+        # 바뀐 공개 column의 검색 key만 다시 생성
+        refresh_search_keys([personal_info.pk], column_names=p_info.keys())
+        if CERTIFICATE_COLUMN in p_info:
+            refresh_search_documents(
+                Person.objects.filter(personal_info=personal_info).values("p_id")
+            )
+
+
+def apply_change_request_reviews(change_requests, decisions, reviewer):
+    """
+    pending 상태의 change_requests에 decisions({id: "approved" | "rejected"})를 적용.
+    승인된 값은 사람별로 모아 merge_personal_info로 한 번에 병합하고, 요청 상태/검토자는
+    bulk_update 한 번으로 기록. 요청 id별 결과({"id", "status"} 또는 {"id", "error"}) 반환.
+    """
+    columns = get_column_registry()
+    now = timezone.now()
+    persons = {
+        person.p_id: person
+        for person in Person.objects.filter(
+            p_id__in={req.person_id for req in change_requests}
+        ).select_related("personal_info")
+    }
+
+    approved = {}
+    results = {}
+    reviewed = []
+    # 같은 column에 대한 요청이 여러 개면 나중에 요청된 값이 반영되도록 순서대로 처리
+    for req in sorted(change_requests, key=lambda req: (req.requested_at, req.id)):
+        status = decisions[req.id]
+        if status == "approved":
+            personal_info = persons[req.person_id].personal_info
+            if not personal_info:
+                results[req.id] = {
+                    "id": req.id,
+                    "error": "해당 직원의 PersonalInfo가 존재하지 않습니다.",
+                }
+                continue
+            column = columns.by_id.get(req.column_id) or req.column
+            if column.column_name in RESTRICTED_FIELDS:
+                target = "fields"
+            elif column.is_public:
+                target = "p_info"
+            else:
+                target = "p_card_info"
+            changes = approved.setdefault(
+                req.person_id,
+                (personal_info, {"fields": {}, "p_info": {}, "p_card_info": {}}),
+            )[1]
+            changes[target][column.column_name] = req.new_value
+            # 승인 후 바로 반영되므로 최종 상태는 applied
+            status = "applied"
+        req.status = status
+        req.reviewed_at = now
+        req.reviewed_by = reviewer
+        reviewed.append(req)
+        results[req.id] = {"id": req.id, "status": status}
+
+    with transaction.atomic():
+        for personal_info, changes in approved.values():
+            merge_personal_info(personal_info, **changes)
+        PersonCardChangeRequest.objects.bulk_update(
+            reviewed, ["status", "reviewed_at", "reviewed_by"]
+        )
+    return [results[req.id] for req in change_requests]
+
+
 class PersonalInfoUpdateSerializer(serializers.ModelSerializer):
     phone_number = serializers.CharField(
         source="main_phone_number", required=False, allow_null=True
@@ -130,95 +262,83 @@ class PersonalInfoUpdateSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         # Pop out p_info and p_card_info data
-        new_p_card_info_data = validated_data.pop("p_card_info", None)["p_card_info"]
+        new_p_card_info_data = (validated_data.pop("p_card_info", None) or {}).get(
+            "p_card_info"
+        )
         new_p_info_data = validated_data.pop("p_info", None)
+        columns = get_column_registry()
+        person = instance.person
+        change_requests = []
+
+        def request_change(column, old_value, new_value):
+            change_requests.append(
+                PersonCardChangeRequest(
+                    person=person,
+                    column=column,
+                    old_value=old_value,
+                    new_value=new_value,
+                    status="pending",
+                    supporting_material=(
+                        new_value.get("supporting_material")
+                        if isinstance(new_value, dict)
+                        else None
+                    ),
+                )
+            )
 
         # Process RESTRICTED_FIELDS: don't update them immediately; create change requests instead.
-        change_requests = []
         for field in RESTRICTED_FIELDS:
             if field in validated_data:
                 new_value = validated_data.pop(field)
                 old_value = getattr(instance, field, "")
                 if old_value != new_value:
-                    supporting_material = new_value["supporting_material"]
-                    # Create a change request (status is pending)
-                    req = PersonCardChangeRequest.objects.create(
-                        person=instance.person,
-                        field_name=field,
-                        old_value=old_value,
-                        new_value=new_value,
-                        status="pending",
-                        supporting_material=supporting_material,
-                    )
-                    change_requests.append(req)
-
-        # Update instance with remaining fields immediately
-        instance = super().update(instance, validated_data)
-
-        # Process p_info updates
-        if new_p_info_data is not None:
-            current_p_info = instance.p_info if instance.p_info else {}
-            for key, new_value in new_p_info_data.items():
-                column = PersonCardColumns.objects.filter(column_name=key).first()
-                if column and column.permission_required:
-                    old_value = current_p_info.get(key, "")
-                    if old_value != new_value:
-                        supporting_material = (
-                            new_value["supporting_material"]
-                            if "supporting_material" in new_value
-                            else None
-                        )
-                        PersonCardChangeRequest.objects.create(
-                            person=instance.person,
-                            column=column,
-                            old_value=old_value,
-                            new_value=new_value,
-                            status="pending",
-                            supporting_material=supporting_material,
+                    column = columns.get(field)
+                    if column is None:
+                        raise serializers.ValidationError(
+                            {field: "변경 요청을 위한 column이 등록되어 있지 않습니다."}
                         )
+                    request_change(column, old_value, new_value)
+
+        # 변경 허가가 필요 없는 key만 모아서 DB에서 병합 (허가가 필요한 key는 변경 요청)
+        def split_changes(current, new_data):
+            direct = {}
+            for key, new_value in new_data.items():
+                if columns.requires_permission(key):
+                    old_value = current.get(key, "")
+                    if old_value != new_value:
+                        request_change(columns.get(key), old_value, new_value)
                     # Do not immediately update
                 else:
-                    current_p_info[key] = new_value
-            instance.p_info = current_p_info
-            instance.save()
+                    direct[key] = new_value
+            return direct
 
-        # Process p_card_info updates similarly
+        p_info = None
+        if new_p_info_data is not None:
+            p_info = split_changes(instance.p_info or {}, new_p_info_data)
+        p_card_info = None
         if new_p_card_info_data is not None:
-            if instance.p_card_info and instance.p_card_info.p_card_info:
-                current_p_card_info = instance.p_card_info.p_card_info
-            else:
-                current_p_card_info = {}
-            for key, new_value in new_p_card_info_data.items():
-                log.critical("key: %s, new_value: %s", key, new_value)
-                column = PersonCardColumns.objects.filter(column_name=key).first()
-                if column and column.permission_required:
-                    old_value = current_p_card_info.get(key, {})
-                    if old_value != new_value:
-                        supporting_material = (
-                            new_value["supporting_material"]
-                            if "supporting_material" in new_value
-                            else None
-                        )
-                        PersonCardChangeRequest.objects.create(
-                            person=instance.person,
-                            column=column,
-                            old_value=old_value,
-                            new_value=new_value,
-                            status="pending",
-                            supporting_material=supporting_material,
-                        )
-                else:
-                    current_p_card_info[key] = new_value
-            # Ensure p_card_info instance exists
-            p_card_info_instance = instance.p_card_info
-            if not p_card_info_instance:
-                p_card_info_instance = PersonCardInfo.objects.create()
-                instance.p_card_info = p_card_info_instance
-                instance.save()
-            if current_p_card_info:
-                p_card_info_instance.p_card_info = current_p_card_info
-                p_card_info_instance.save()
+            current_p_card_info = (
+                instance.p_card_info.p_card_info if instance.p_card_info else None
+            )
+            p_card_info = split_changes(current_p_card_info or {}, new_p_card_info_data)
+
+        if change_requests:
+            # HR 검토 범위용 소속 법인 (소속 팀 전체 기준)
+            corporation_ids = sorted(
+                person.member_of_teams.filter(corporation__isnull=False)
+                .values_list("corporation_id", flat=True)
+                .distinct()
+            )
+            for change_request in change_requests:
+                change_request.corporation_ids = corporation_ids
+
+        with transaction.atomic():
+            merge_personal_info(
+                instance, fields=validated_data, p_info=p_info, p_card_info=p_card_info
+            )
+            PersonCardChangeRequest.objects.bulk_create(change_requests)
 
+        instance.refresh_from_db()
         return instance
 
 
@@ -228,6 +348,7 @@ class PersonCardChangeListSerializer(serializers.ModelSerializer):
         fields = [
             "id",
             "person",
+            "corporation_ids",
             "column",
             "old_value",
             "new_value",
@@ -273,53 +394,60 @@ class PersonCardChangeRequestReviewSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 "Status must be either 'approved' or 'rejected'."
             )
-        instance.status = new_status
-        instance.reviewed_at = timezone.now()
         request = self.context.get("request")
-        if request and hasattr(request, "user"):
-            instance.reviewed_by = request.user.person
-        instance.save()
+        reviewer = request.user.person if request and hasattr(request, "user") else None
+
+        # 일괄 검토와 같은 경로로 처리 (승인된 경우에만 PersonalInfo에 반영)
+        (result,) = apply_change_request_reviews(
+            [instance], {instance.id: new_status}, reviewer
+        )
+        if "error" in result:
+            raise serializers.ValidationError(result["error"])
+        return instance
 
-        if new_status == "approved":
-            # 실제 개인정보 업데이트: 승인된 경우에만 PersonalInfo에 반영
-            personal_info = instance.person.personal_info
-            if not personal_info:
-                raise serializers.ValidationError(
-                    "해당 직원의 PersonalInfo가 존재하지 않습니다."
-                )
 
-            column = instance.column  # PersonCardColumns instance
-            new_value = instance.new_value
+class ChangeRequestDecisionSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=["approved", "rejected"])
 
-            # 만약 해당 칼럼이 top-level 필드(예: RESTRICTED_FIELDS)에 해당하면
-            if column.column_name in RESTRICTED_FIELDS:
-                setattr(personal_info, column.column_name, new_value)
-                personal_info.save()
-            else:
-                # JSON 업데이트: 공개 정보와 비공개 정보 구분
-                if column.is_public:
-                    current_info = personal_info.p_info if personal_info.p_info else {}
-                    current_info[column.column_name] = new_value
-                    personal_info.p_info = current_info
-                    personal_info.save()
-                else:
-                    p_card_info_instance = personal_info.p_card_info
-                    if not p_card_info_instance:
-                        p_card_info_instance = PersonCardInfo.objects.create()
-                        personal_info.p_card_info = p_card_info_instance
-                        personal_info.save()
-                    current_p_card_info = (
-                        p_card_info_instance.p_card_info
-                        if p_card_info_instance.p_card_info
-                        else {}
-                    )
-                    current_p_card_info[column.column_name] = new_value
-                    p_card_info_instance.p_card_info = current_p_card_info
-                    p_card_info_instance.save()
-            # 승인되었으므로 최종 상태 변경
-            instance.status = "applied"
-            instance.save()
-        return instance
+
+# 개인정보 수정 요청 일괄 검토
+class PersonCardChangeBulkReviewSerializer(serializers.Serializer):
+    reviews = ChangeRequestDecisionSerializer(many=True, allow_empty=False)
+
+    def validate_reviews(self, value):
+        ids = [review["id"] for review in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("중복된 요청 id가 있습니다.")
+        return value
+
+    def save(self):
+        """context의 queryset(검토 가능한 pending 요청)에 있는 요청만 처리."""
+        decisions = {
+            review["id"]: review["status"] for review in self.validated_data["reviews"]
+        }
+        request = self.context["request"]
+        with transaction.atomic():
+            # 동시에 같은 요청을 검토하지 않도록 잠금
+            change_requests = list(
+                self.context["queryset"].filter(id__in=decisions).select_for_update()
+            )
+            results = {
+                result["id"]: result
+                for result in apply_change_request_reviews(
+                    change_requests, decisions, request.user.person
+                )
+            }
+        return [
+            results.get(
+                request_id,
+                {
+                    "id": request_id,
+                    "error": "검토할 수 없는 요청입니다 (없음/처리됨/권한 없음).",
+                },
+            )
+            for request_id in decisions
+        ]
 
 
 class RoleSupervisorHistorySerializer(serializers.ModelSerializer):
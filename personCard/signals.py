@@ -0,0 +1,41 @@
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+
+from company.models import Team
+from .models import PersonCardChangeRequest
+
+
+# pending 수정 요청의 검토 법인(corporation_ids)을 요청자의 현재 소속과 맞춤
+@receiver(m2m_changed, sender=Team.members.through)
+def refresh_change_request_corporation(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action == "pre_clear" and not reverse:
+        # team.members.clear()는 post_clear 시점에 제거된 사람을 알 수 없으므로 미리 저장
+        instance._cleared_requester_ids = list(
+            instance.members.values_list("p_id", flat=True)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse:
+        p_ids = [instance.pk]
+    elif action == "post_clear":
+        p_ids = getattr(instance, "_cleared_requester_ids", [])
+    else:
+        p_ids = pk_set or []
+    PersonCardChangeRequest.objects.filter(
+        status="pending", person_id__in=p_ids
+    ).refresh_corporations()
+
+
+@receiver(post_save, sender=Team)
+def refresh_change_request_corporation_on_team(
+    sender, instance, created, raw=False, **kwargs
+):
+    # 팀의 법인이 바뀐 경우 (새 팀은 아직 팀원이 없음)
+    if not created and not raw:
+        PersonCardChangeRequest.objects.filter(
+            status="pending", person__member_of_teams=instance
+        ).refresh_corporations()
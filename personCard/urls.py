@@ -22,12 +22,29 @@ urlpatterns = [
         PersonCardChangeListAPIView.as_view(),
         name="persona-card-change-list",
     ),
+    # 개인정보 수정 요청 검토함 (Master/HR Team)
+    path(
+        "change-request/inbox/",
+        PersonCardChangeInboxAPIView.as_view(),
+        name="person-card-change-inbox",
+    ),
+    path(
+        "change-request/inbox/counts/",
+        PersonCardChangePendingCountAPIView.as_view(),
+        name="person-card-change-pending-counts",
+    ),
     #  개인정보 수정 허가 (Master/HR Team)
     path(
         "change-request/<int:request_id>/review/",
         PersonCardChangeReviewAPIView.as_view(),
         name="person-card-update-review",
     ),
+    #  개인정보 수정 요청 일괄 검토 (Master/HR Team)
+    path(
+        "change-request/review/bulk/",
+        PersonCardChangeBulkReviewAPIView.as_view(),
+        name="person-card-bulk-review",
+    ),
     # 인사카드 조회
     path("<int:p_id>/", PersonCardDetailAPIView.as_view(), name="person-card-detail"),
     # 직무 히스토리 정보 불러오기 (본인/팀장/Master/HR Team)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from personCard.models import PersonCardColumns
+from personCard.columns import get_column_registry
 
 
 class PersonCardInfoValidator:
@@ -13,9 +13,8 @@ class PersonCardInfoValidator:
 
     def __call__(self, value):
         errors = {}
-        # 모든 PersonCardColumns 정보를 가져와 사전으로 구성
-        columns = PersonCardColumns.objects.all()
-        column_map = {col.column_name: col for col in columns}
+        # column 정보는 registry에서 조회 (column 변경 시에만 DB 조회)
+        column_map = get_column_registry().by_name
 
         for key, val in value.items():
             if key not in column_map:
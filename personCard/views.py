@@ -2,21 +2,28 @@ from django.shortcuts import get_object_or_404
 from company.permissions import *
 from company.models import *
 from django.core.exceptions import PermissionDenied
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 
 from rest_framework.generics import (
+    GenericAPIView,
     ListAPIView,
     RetrieveAPIView,
     RetrieveUpdateDestroyAPIView,
     RetrieveUpdateAPIView,
 )
 from rest_framework.response import Response
-from rest_framework.exceptions import NotFound
+from rest_framework.views import APIView
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import AllowAny
 
 from rest_condition import Or
 
-from company.permissions import IsMasterHRTeam
+from company.permissions import IsMasterHRTeam, get_auth_context
 from person.models import PersonalInfo
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from .models import *
 from .serializers import *
@@ -32,12 +39,24 @@ class PersonCardListAPIView(ListAPIView):
 
     def get_queryset(self):
         name = self.request.query_params.get("name")
-        if not name:
-            return Person.objects.all()
-        return Person.objects.filter(name__icontains=name)
+        queryset = Person.objects.order_by("p_id")
+        if name:
+            queryset = queryset.filter(name__icontains=name)
+        return prefetch_person_cards(queryset)
+
+
+def person_card_etag(request, p_id, *args, **kwargs):
+    # person.card_version만 조회 (개인정보/인사카드 테이블은 읽지 않음)
+    card_version = (
+        Person.objects.filter(p_id=p_id).values_list("card_version", flat=True).first()
+    )
+    if card_version is None:
+        return None
+    return f"person-{p_id}-{card_version}"
 
 
 # 검색 페이지 우측 특정한 사람 공개 정보 불러오기
+@method_decorator(condition(etag_func=person_card_etag), name="get")
 @swagger_auto_schema(
     operation_description="검색 페이지 우측 특정한 사람 공개 정보 불러오기"
 )
@@ -79,37 +98,111 @@ class PersonCardChangeListAPIView(ListAPIView):
     permission_classes = [Or(IsMasterHRTeam, IsHRTeam)]
 
     def get_queryset(self):
-        user_person = self.request.user.person
+        context = get_auth_context(self.request)
         c_id = self.kwargs.get("c_id")
 
         # MasterHRTeam은 모든 요청을 볼 수 있음
-        if IsMasterHRTeam().has_permission(self.request, self):
+        if context.is_master_hr:
             if c_id:
-                return (
-                    PersonCardChangeRequest.objects.filter(
-                        person__member_of_teams__corporation__c_id=c_id
-                    )
-                    .distinct()
-                    .order_by("requested_at")
-                )
+                return PersonCardChangeRequest.objects.filter(
+                    corporation_ids__contains=[c_id]
+                ).order_by("requested_at")
             return PersonCardChangeRequest.objects.all().order_by("requested_at")
 
         # HR팀원이라면 해당 법인의 HR팀에 속해야 함
-        try:
-            corp = Corporation.objects.get(c_id=c_id)
-        except Corporation.DoesNotExist:
-            raise PermissionDenied("해당 Corporation이 존재하지 않습니다.")
-
-        if user_person not in corp.hr_team.members.all():
+        if c_id not in context.hr_corp_ids:
             raise PermissionDenied("해당 법인의 HR팀원만 접근할 수 있습니다.")
 
-        return (
+        return PersonCardChangeRequest.objects.filter(
+            corporation_ids__contains=[c_id]
+        ).order_by("requested_at")
+
+
+# 개인정보 수정 요청 검토함 (status별, cursor pagination)
+class PersonCardChangeInboxAPIView(ListAPIView):
+    serializer_class = PersonCardChangeListSerializer
+    pagination_class = PersonCardChangeInboxPagination
+    permission_classes = [Or(IsMasterHRTeam, IsHRTeam)]
+
+    @swagger_auto_schema(
+        operation_description="개인정보 수정 요청 검토함",
+        manual_parameters=[
+            openapi.Parameter(
+                "status",
+                openapi.IN_QUERY,
+                description="pending(기본) / approved / applied / rejected",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                "c_id",
+                openapi.IN_QUERY,
+                description="Corporation ID",
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            ),
+        ],
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        status = self.request.query_params.get("status", "pending")
+        if status not in dict(PersonCardChangeRequest.STATUS_CHOICES):
+            raise ValidationError({"status": "알 수 없는 status입니다."})
+        c_id = self.request.query_params.get("c_id")
+        if c_id and not c_id.isdigit():
+            raise ValidationError({"c_id": "c_id는 정수여야 합니다."})
+
+        queryset = PersonCardChangeRequest.objects.filter(status=status)
+        context = get_auth_context(self.request)
+        if not context.is_master_hr:
+            queryset = queryset.filter(
+                corporation_ids__overlap=sorted(context.hr_corp_ids)
+            )
+        if c_id:
+            queryset = queryset.filter(corporation_ids__contains=[int(c_id)])
+        return queryset
+
+
+# 법인별 pending 수정 요청 개수
+class PersonCardChangePendingCountAPIView(APIView):
+    permission_classes = [Or(IsMasterHRTeam, IsHRTeam)]
+
+    @swagger_auto_schema(operation_description="법인별 pending 수정 요청 개수")
+    def get(self, request, *args, **kwargs):
+        # 요청 하나가 요청자의 모든 소속 법인에 집계됨 (법인마다 GIN index로 count)
+        pending = (
             PersonCardChangeRequest.objects.filter(
-                person__member_of_teams__corporation=corp
+                status="pending", corporation_ids__contains=[OuterRef("c_id")]
             )
-            .distinct()
-            .order_by("requested_at")
+            .order_by()
+            .values("status")
+            .annotate(count=Count("id"))
+            .values("count")
         )
+        corporations = Corporation.objects.all()
+        context = get_auth_context(request)
+        if not context.is_master_hr:
+            corporations = corporations.filter(c_id__in=context.hr_corp_ids)
+        counts = (
+            corporations.annotate(pending=Coalesce(Subquery(pending), 0))
+            .order_by("c_id")
+            .values("c_id", "pending")
+        )
+        return Response([row for row in counts if row["pending"]], status=200)
+
+
+def reviewable_change_requests(request):
+    """요청 사용자가 검토할 수 있는 pending 상태의 수정 요청"""
+    qs = PersonCardChangeRequest.objects.filter(status="pending")
+    context = get_auth_context(request)
+
+    # 만약 사용자가 MasterHRTeam이 아니라면, 자신이 관리하는 직원들의 요청만 필터링
+    if not context.is_master_hr:
+        # 목록/검토함과 같은 범위: 사용자가 HR팀원인 법인 중 하나에 소속된 요청자의 요청
+        qs = qs.filter(corporation_ids__overlap=sorted(context.hr_corp_ids))
+    return qs.order_by("requested_at")
 
 
 # 개인정보 수정 허가
@@ -121,16 +214,27 @@ class PersonCardChangeReviewAPIView(RetrieveUpdateAPIView):
     lookup_url_kwarg = "request_id"
 
     def get_queryset(self):
-        qs = PersonCardChangeRequest.objects.filter(status="pending")
-        user_person = self.request.user.person
-
-        # 만약 사용자가 MasterHRTeam이 아니라면, 자신이 관리하는 직원들의 요청만 필터링
-        if not IsMasterHRTeam().has_permission(self.request, self):
-            # 사용자가 속한 HR팀에 해당하는 법인의 구성원만 조회
-            qs = qs.filter(
-                person__member_of_teams__corporation__hr_team__members=user_person
-            )
-        return qs.distinct().order_by("requested_at")
+        return reviewable_change_requests(self.request)
+
+
+# 개인정보 수정 요청 일괄 검토
+class PersonCardChangeBulkReviewAPIView(GenericAPIView):
+    serializer_class = PersonCardChangeBulkReviewSerializer
+    permission_classes = [Or(IsMasterHRTeam, IsHRTeam)]
+
+    def get_queryset(self):
+        return reviewable_change_requests(self.request)
+
+    @swagger_auto_schema(
+        operation_description="개인정보 수정 요청 일괄 검토 (요청별 결과 반환)"
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(
+            data=request.data,
+            context={"request": request, "queryset": self.get_queryset()},
+        )
+        serializer.is_valid(raise_exception=True)
+        return Response({"results": serializer.save()}, status=200)
 
 
 # 직무 히스토리 정보 불러오기
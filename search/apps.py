@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from django.db.models.signals import pre_migrate
+
+
+def create_trigram_extension(sender, using, **kwargs):
+    # gin_trgm_ops index(검색 key, 팀/법인 search_name)를 만들기 전에 pg_trgm extension 필요
+    from django.db import connections
+
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
 
 
 class SearchConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "search"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        pre_migrate.connect(create_trigram_extension, sender=self)
@@ -0,0 +1,153 @@
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import transaction
+from django.db.models import OuterRef
+
+from company.models import Role, Team
+from person.models import Person, PersonalInfo
+from personCard.columns import get_column_registry
+from .models import PersonCardSearchKey, PersonSearchDocument
+from .normalize import chosung_key, normalize_search_key, search_keys_for
+
+CERTIFICATE_COLUMN = "자격증"
+
+# column 단위 재색인 시 한 번에 처리하는 PersonalInfo 수
+REINDEX_BATCH_SIZE = 1000
+
+# PersonSearchDocument.role_names의 구분자 (정규화된 값에는 포함되지 않음)
+ROLE_SEPARATOR = "|"
+
+
+def searchable_columns(registry=None):
+    """검색 key를 만드는 column: 공개 txt column"""
+    registry = registry or get_column_registry()
+    return {
+        name: registry.by_name[name]
+        for name in registry.public_names
+        if registry.by_name[name].column_type == "txt"
+    }
+
+
+def refresh_search_keys(personal_info_ids, column_names=None):
+    """
+    해당 PersonalInfo를 가진 Person들의 검색 key를 p_info 기준으로 다시 생성.
+    column_names를 주면 그 column의 key만 갱신 (부분 수정 시).
+    """
+    columns = searchable_columns()
+    if column_names is not None:
+        columns = {name: columns[name] for name in column_names if name in columns}
+        if not columns:
+            return
+
+    persons = Person.objects.filter(personal_info_id__in=personal_info_ids).values_list(
+        "p_id", "personal_info__p_info"
+    )
+    keys = []
+    p_ids = []
+    for p_id, p_info in persons:
+        p_ids.append(p_id)
+        for name, column in columns.items():
+            for key in search_keys_for((p_info or {}).get(name)):
+                keys.append(PersonCardSearchKey(person_id=p_id, column=column, key=key))
+    if not p_ids:
+        return
+
+    with transaction.atomic():
+        stale = PersonCardSearchKey.objects.filter(person_id__in=p_ids)
+        if column_names is not None:
+            stale = stale.filter(column__in=columns.values())
+        stale.delete()
+        PersonCardSearchKey.objects.bulk_create(keys, ignore_conflicts=True)
+
+
+def refresh_column_search_keys(column_id):
+    """
+    column 하나의 검색 key를 전체 PersonalInfo에 대해 REINDEX_BATCH_SIZE씩 다시 생성.
+    column 생성/수정(공개 전환, 이름·type 변경) 후 호출하며, 검색 대상이 아니면 key만 삭제.
+    갱신된 PersonalInfo 수를 반환.
+    """
+    registry = get_column_registry()
+    column = registry.by_id.get(column_id)
+    PersonCardSearchKey.objects.filter(column_id=column_id).delete()
+    if column is None or column.column_name not in searchable_columns(registry):
+        return 0
+
+    personal_info_ids = (
+        PersonalInfo.objects.filter(p_info__has_key=column.column_name)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    refreshed = 0
+    last_id = 0
+    while True:
+        batch = list(personal_info_ids.filter(pk__gt=last_id)[:REINDEX_BATCH_SIZE])
+        if not batch:
+            return refreshed
+        refresh_search_keys(batch, column_names=[column.column_name])
+        refreshed += len(batch)
+        last_id = batch[-1]
+
+
+def refresh_search_documents(p_ids):
+    """
+    p_ids(id 목록 또는 p_id를 반환하는 queryset)에 해당하는 PersonSearchDocument를
+    query 한 번으로 다시 계산해 upsert. signal이 발생하지 않는 bulk 경로에서도 호출.
+    """
+    active_teams = Team.objects.filter(members=OuterRef("pk"), is_active=True)
+    rows = (
+        Person.objects.filter(p_id__in=p_ids)
+        .annotate(
+            active_team_ids=ArraySubquery(active_teams.values("t_id")),
+            active_corporation_ids=ArraySubquery(
+                active_teams.filter(corporation__isnull=False)
+                .values("corporation_id")
+                .distinct()
+            ),
+            active_role_names=ArraySubquery(
+                Role.objects.filter(
+                    person=OuterRef("pk"), end_date__isnull=True
+                ).values("role_name")
+            ),
+        )
+        .values_list(
+            "p_id",
+            "name",
+            "personal_info__p_info",
+            "active_team_ids",
+            "active_corporation_ids",
+            "active_role_names",
+        )
+    )
+
+    documents = []
+    for p_id, name, p_info, team_ids, corporation_ids, role_names in rows:
+        documents.append(
+            PersonSearchDocument(
+                person_id=p_id,
+                name=name,
+                search_name=normalize_search_key(name),
+                name_chosung=chosung_key(name),
+                team_ids=team_ids,
+                corporation_ids=corporation_ids,
+                role_names=ROLE_SEPARATOR.join(
+                    normalize_search_key(role) for role in role_names if role
+                ),
+                certificates=search_keys_for((p_info or {}).get(CERTIFICATE_COLUMN)),
+            )
+        )
+    if documents:
+        PersonSearchDocument.objects.bulk_create(
+            documents,
+            update_conflicts=True,
+            unique_fields=["person"],
+            update_fields=[
+                "name",
+                "search_name",
+                "name_chosung",
+                "team_ids",
+                "corporation_ids",
+                "role_names",
+                "certificates",
+                "updated_at",
+            ],
+        )
+    return len(documents)
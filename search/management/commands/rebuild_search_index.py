@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+
+from company.models import Corporation, Team
+from person.models import Person, PersonalInfo
+from search.indexing import (
+    refresh_search_documents,
+    refresh_search_keys,
+    searchable_columns,
+)
+from search.models import PersonCardSearchKey
+
+
+class Command(BaseCommand):
+    help = (
+        "모든 Person의 인사카드 검색 key(PersonCardSearchKey), 검색 문서(PersonSearchDocument)와 "
+        "Team/Corporation의 검색용 이름(search_name, name_chosung)을 다시 생성합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        # 비공개로 바뀌었거나 txt가 아닌 column의 key 삭제
+        removed, _ = PersonCardSearchKey.objects.exclude(
+            column__in=searchable_columns().values()
+        ).delete()
+
+        ids = list(PersonalInfo.objects.order_by("pk").values_list("pk", flat=True))
+        for start in range(0, len(ids), batch_size):
+            refresh_search_keys(ids[start : start + batch_size])
+
+        p_ids = list(Person.objects.order_by("pk").values_list("pk", flat=True))
+        for start in range(0, len(p_ids), batch_size):
+            refresh_search_documents(p_ids[start : start + batch_size])
+
+        names = {
+            model.__name__: self.rebuild_search_names(model, batch_size)
+            for model in (Corporation, Team)
+        }
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"personal_info indexed: {len(ids)}, stale keys removed: {removed}, "
+                f"search documents: {len(p_ids)}, "
+                f"search_name updated: {names}"
+            )
+        )
+
+    def rebuild_search_names(self, model, batch_size):
+        fields = list(model.search_name_fields)
+        updated = []
+        for obj in model.objects.only("pk", "name", *fields).iterator():
+            values = model.search_name_values(obj.name)
+            if any(getattr(obj, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(obj, field, value)
+                updated.append(obj)
+        model.objects.bulk_update(updated, fields, batch_size=batch_size)
+        return len(updated)
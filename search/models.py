@@ -1 +1,89 @@
-# Create your models here.
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models
+
+
+class PersonCardSearchKey(models.Model):
+    """
+    공개 인사카드 column(p_info) 값을 정규화한 검색 key. 값 하나당 row 하나.
+    exact/prefix 검색은 (column, key) btree, contains 검색은 key의 trigram GIN index 사용.
+    """
+
+    person = models.ForeignKey(
+        "person.Person", on_delete=models.CASCADE, related_name="search_keys"
+    )
+    column = models.ForeignKey(
+        "personCard.PersonCardColumns",
+        on_delete=models.CASCADE,
+        related_name="search_keys",
+    )
+    key = models.TextField()  # normalize_search_key 결과
+
+    class Meta:
+        db_table = "person_card_search_key"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["column", "person", "key"], name="search_key_unique"
+            ),
+        ]
+        indexes = [
+            # = 와 LIKE 'q%' 모두 사용 가능하도록 text_pattern_ops
+            models.Index(
+                fields=["column", "key"],
+                name="search_key_prefix_idx",
+                opclasses=["int8_ops", "text_pattern_ops"],
+            ),
+            GinIndex(
+                fields=["key"], name="search_key_trgm_idx", opclasses=["gin_trgm_ops"]
+            ),
+        ]
+
+
+class PersonSearchDocument(models.Model):
+    """
+    사람 검색용 비정규화 문서. Person 하나당 row 하나이며 search.signals와 bulk 경로의
+    refresh_search_documents 호출로 갱신. 검색 조건(이름/초성, 법인, 팀, 직무, 자격증)을
+    이 table 하나의 index로 처리한 뒤 p_id 목록으로 인사카드를 조회한다.
+    """
+
+    person = models.OneToOneField(
+        "person.Person",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_document",
+    )
+    name = models.CharField(max_length=100)  # 정렬용 원래 이름
+    search_name = models.CharField(max_length=100, default="")
+    name_chosung = models.CharField(max_length=100, default="")
+    # 활성 소속 팀과 그 법인
+    team_ids = ArrayField(models.BigIntegerField(), default=list, blank=True)
+    corporation_ids = ArrayField(models.BigIntegerField(), default=list, blank=True)
+    # 진행 중인 Role 이름 (정규화 후 '|'로 연결)
+    role_names = models.TextField(default="", blank=True)
+    # 공개 자격증 column 값의 검색 key
+    certificates = ArrayField(models.TextField(), default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "person_search_document"
+        indexes = [
+            models.Index(fields=["name", "person"], name="search_doc_name_idx"),
+            GinIndex(fields=["team_ids"], name="search_doc_team_idx"),
+            GinIndex(fields=["corporation_ids"], name="search_doc_corp_idx"),
+            GinIndex(fields=["certificates"], name="search_doc_cert_idx"),
+            GinIndex(
+                fields=["search_name"],
+                name="search_doc_name_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(
+                fields=["name_chosung"],
+                name="search_doc_chosung_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+            GinIndex(
+                fields=["role_names"],
+                name="search_doc_role_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
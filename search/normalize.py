@@ -0,0 +1,83 @@
+import re
+import unicodedata
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_search_key(value):
+    """
+    검색 key 정규화: 유니코드 NFKC, 소문자화, 공백 제거.
+    저장되는 key와 검색어 모두 같은 규칙을 거치므로 '정보 처리 기사'로도 '정보처리기사'가 검색된다.
+    """
+    value = unicodedata.normalize("NFKC", str(value)).casefold()
+    return _WHITESPACE.sub("", value)
+
+
+def extract_search_values(value):
+    """
+    p_info의 column 값에서 검색 대상 문자열을 추출.
+    값은 문자열 또는 {"value": ..., "supporting_material": ...} 형태이며, 다중 값은 list.
+    """
+    if value is None:
+        return []
+    if isinstance(value, dict):
+        return extract_search_values(value.get("value"))
+    if isinstance(value, (list, tuple)):
+        return [text for item in value for text in extract_search_values(item)]
+    return [str(value)]
+
+
+def search_keys_for(value):
+    """column 값 하나에서 중복 없는 정규화 key 목록"""
+    keys = (normalize_search_key(text) for text in extract_search_values(value))
+    return list(dict.fromkeys(key for key in keys if key))
+
+
+# 한글 초성 (유니코드 음절 순서)
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_CHOSUNG_INDEX = {jamo: i for i, jamo in enumerate(CHOSUNG)}
+_HANGUL_FIRST, _HANGUL_LAST = 0xAC00, 0xD7A3
+_SYLLABLES_PER_CHOSUNG = 21 * 28
+# NFKC는 호환 자모(ㄱ)를 첫소리 자모(U+1100~)로 바꾸므로 다시 호환 자모로 되돌림
+_CONJOINING_TO_CHOSUNG = str.maketrans(
+    {0x1100 + i: jamo for i, jamo in enumerate(CHOSUNG)}
+)
+
+
+def _normalize_jamo(value):
+    return normalize_search_key(value).translate(_CONJOINING_TO_CHOSUNG)
+
+
+def _chosung_of(char):
+    code = ord(char)
+    if _HANGUL_FIRST <= code <= _HANGUL_LAST:
+        return CHOSUNG[(code - _HANGUL_FIRST) // _SYLLABLES_PER_CHOSUNG]
+    return char
+
+
+def chosung_key(value):
+    """
+    한글 음절을 초성으로 바꾼 검색 key ('홍 길동' → 'ㅎㄱㄷ'). 한글 외 문자는 정규화만 적용.
+    """
+    return "".join(_chosung_of(char) for char in _normalize_jamo(value))
+
+
+def has_chosung(query):
+    """검색어에 초성(자음 jamo)이 하나라도 있는지 여부"""
+    return any(char in _CHOSUNG_INDEX for char in _normalize_jamo(query))
+
+
+def chosung_regex(query):
+    """
+    초성/음절이 섞인 검색어를 정규화된 이름에 대한 정규식으로 변환 ('홍ㄱㄷ' → '홍[가-깋][다-딯]').
+    chosung_key로 후보를 좁힌 뒤 음절 부분까지 일치하는지 확인하는 데 사용.
+    """
+    parts = []
+    for char in _normalize_jamo(query):
+        index = _CHOSUNG_INDEX.get(char)
+        if index is None:
+            parts.append(re.escape(char))
+            continue
+        first = _HANGUL_FIRST + index * _SYLLABLES_PER_CHOSUNG
+        parts.append(f"[{chr(first)}-{chr(first + _SYLLABLES_PER_CHOSUNG - 1)}]")
+    return "".join(parts)
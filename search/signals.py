@@ -0,0 +1,87 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from company.models import Role, Team
+from person.models import Person, PersonalInfo
+from .indexing import refresh_search_documents, refresh_search_keys
+
+
+@receiver(post_save, sender=PersonalInfo)
+def refresh_search_keys_on_personal_info(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    if raw or (update_fields is not None and "p_info" not in update_fields):
+        return
+    refresh_search_keys([instance.pk])
+    refresh_search_documents(
+        Person.objects.filter(personal_info=instance).values("p_id")
+    )
+
+
+@receiver(post_save, sender=Person)
+def refresh_search_keys_on_person(
+    sender, instance, created=False, raw=False, update_fields=None, **kwargs
+):
+    if raw:
+        return
+    refresh_search_documents([instance.pk])
+    # personal_info가 연결/변경된 경우
+    if instance.personal_info_id is None:
+        return
+    if update_fields is not None and "personal_info" not in update_fields:
+        return
+    refresh_search_keys([instance.personal_info_id])
+
+
+# --- PersonSearchDocument: 소속 팀/직무 변경 ---
+@receiver(m2m_changed, sender=Team.members.through)
+def refresh_search_documents_on_members(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action == "pre_clear" and not reverse:
+        # team.members.clear()는 post_clear 시점에 제거된 사람을 알 수 없으므로 미리 저장
+        instance._cleared_member_ids = list(
+            instance.members.values_list("p_id", flat=True)
+        )
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse:
+        p_ids = [instance.pk]
+    elif action == "post_clear":
+        p_ids = getattr(instance, "_cleared_member_ids", [])
+    else:
+        p_ids = pk_set or []
+    refresh_search_documents(p_ids)
+
+
+@receiver(post_save, sender=Team)
+def refresh_search_documents_on_team(sender, instance, created, raw=False, **kwargs):
+    # 활성 여부/법인 변경 시 팀원 문서 갱신 (새 팀은 아직 팀원이 없음)
+    if not created and not raw:
+        refresh_search_documents(instance.members.values("p_id"))
+
+
+@receiver(pre_delete, sender=Team)
+def stash_deleted_team_members(sender, instance, **kwargs):
+    instance._deleted_member_ids = list(instance.members.values_list("p_id", flat=True))
+
+
+@receiver(post_delete, sender=Team)
+def refresh_search_documents_on_team_delete(sender, instance, **kwargs):
+    refresh_search_documents(getattr(instance, "_deleted_member_ids", []))
+
+
+@receiver(post_save, sender=Role)
+def refresh_search_documents_on_role(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_search_documents([instance.person_id])
+
+
+@receiver(post_delete, sender=Role)
+def refresh_search_documents_on_role_delete(sender, instance, **kwargs):
+    # Person 삭제에 따른 cascade일 수 있으므로 commit 이후 (삭제된 Person은 건너뜀)
+    person_id = instance.person_id
+    transaction.on_commit(lambda: refresh_search_documents([person_id]))
@@ -2,7 +2,7 @@ from django.urls import path
 from .views import *
 
 urlpatterns = [
-    # Person의 소속 법인/최하위 팀, 자격증으로 검색
+    # Person의 소속 법인/최하위 팀, 이름/자격증 등 공개 인사카드 column으로 검색
     path("person/", PersonSearchAPIView.as_view(), name="search-person"),
     # Team 이름으로 Team 검색
     path("team/", TeamSearchAPIView.as_view(), name="search-team"),
@@ -5,34 +5,73 @@ from rest_framework.permissions import AllowAny
 
 from person.models import Person
 from company.models import Team, Corporation
-from personCard.serializers import PersonCardListSerializer
+from personCard.serializers import PersonCardListSerializer, prefetch_person_cards
 from company.serializers import CorpListSerializer, TeamListSerializer
-
-from django.db.models import F, Func, CharField
-
-
-class RemoveSpaces(Func):
-    function = "REPLACE"
-    template = "%(function)s(%(expressions)s::text, ' ', '')"
-    output_field = CharField()
-
-
-# Person의 소속 법인/팀, 자격증으로 검색
+from company.cache import cached_org_payload
+
+from django.contrib.postgres.search import TrigramSimilarity
+
+from .indexing import CERTIFICATE_COLUMN, searchable_columns
+from .models import PersonCardSearchKey, PersonSearchDocument
+from .normalize import (
+    chosung_key,
+    chosung_regex,
+    has_chosung,
+    normalize_search_key,
+)
+
+# key는 이미 소문자/공백 제거되어 있으므로 대소문자 구분 lookup으로 index 사용
+MATCH_LOOKUPS = {
+    "exact": "key",
+    "prefix": "key__startswith",
+    "contains": "key__contains",
+}
+
+
+def search_by_name(queryset, query_clean):
+    """
+    search_name(공백 제거/소문자화된 이름)에 query_clean이 포함된 row를 유사도 순으로 정렬.
+    LIKE '%q%'는 search_name의 trigram GIN index로 처리됨.
+    """
+    if not query_clean:
+        return queryset.order_by("name")
+    return (
+        queryset.filter(search_name__contains=query_clean)
+        .annotate(similarity=TrigramSimilarity("search_name", query_clean))
+        .order_by("-similarity", "name")
+    )
+
+
+def search_by_chosung(queryset, query):
+    """
+    초성이 섞인 검색어('ㅎㄱㄷ', '홍ㄱㄷ'): name_chosung의 trigram GIN index로 후보를 좁힌 뒤,
+    후보에 대해서만 음절 부분까지 일치하는지 search_name 정규식으로 확인.
+    """
+    return queryset.filter(
+        name_chosung__contains=chosung_key(query),
+        search_name__regex=chosung_regex(query),
+    ).order_by("name")
+
+
+# Person의 소속 법인/팀, 이름(초성 포함)/인사카드 공개 column 값으로 검색
 class PersonSearchAPIView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, *args, **kwargs):
-        # 검색 기준: 'name' 또는 'certificate' (기본은 'name')
-        search_by = request.query_params.get("search_by", "name").lower()
+        # 검색 기준: 'name', 'certificate' 또는 공개 인사카드 column 이름 (기본은 'name')
+        raw_by = request.query_params.get("search_by", "name")
+        search_by = raw_by.lower()
+        # column 검색 방식: exact / prefix / contains (기본은 contains)
+        match = request.query_params.get("match", "contains").lower()
         query = request.query_params.get("q", "")
         filter_corp = request.query_params.get("corp_id")
         filter_team = request.query_params.get("team_id")
         filter_role = request.query_params.get("role")
 
-        persons = Person.objects.all()
+        # 모든 조건을 PersonSearchDocument 한 table에서 처리한 뒤 p_id로 인사카드 조회
+        documents = PersonSearchDocument.objects.all()
 
         # 특정 팀 또는 법인 조건이 들어온 경우 해당 팀(및 하위 조직) 산하 사람들로 범위 한정
-        team_ids = None
         if filter_team:
             try:
                 team = Team.objects.get(t_id=filter_team)
@@ -40,7 +79,8 @@ class PersonSearchAPIView(APIView):
                 return Response(
                     {"detail": "Team not found."}, status=status.HTTP_404_NOT_FOUND
                 )
-            team_ids = self.get_lower_team_ids(team)
+            team_ids = Team.objects.descendants_of(team).values_list("t_id", flat=True)
+            documents = documents.filter(team_ids__overlap=list(team_ids))
         elif filter_corp:
             try:
                 corp = Corporation.objects.get(c_id=filter_corp)
@@ -49,75 +89,96 @@ class PersonSearchAPIView(APIView):
                     {"detail": "Corporation not found."},
                     status=status.HTTP_404_NOT_FOUND,
                 )
-            team_ids = set()
-            for team in corp.teams.all():
-                team_ids.update(self.get_lower_team_ids(team))
-        if team_ids:
-            persons = persons.filter(member_of_teams__t_id__in=team_ids)
+            documents = documents.filter(corporation_ids__contains=[corp.c_id])
 
         if filter_role:
-            persons = persons.filter(roles__role_name__icontains=filter_role)
+            documents = documents.filter(
+                role_names__contains=normalize_search_key(filter_role)
+            )
 
         # 검색 조건 적용
         if search_by == "name":
-            if query:
-                query_clean = query.replace(" ", "")
-                persons = persons.annotate(clean_name=RemoveSpaces(F("name"))).filter(
-                    clean_name__icontains=query_clean
+            if query and has_chosung(query):
+                documents = search_by_chosung(documents, query)
+            elif query:
+                documents = documents.filter(
+                    search_name__contains=normalize_search_key(query)
                 )
-        elif search_by == "certificate":
-            # certificate 검색 시에도 q 파라미터 사용
-            if query:
-                query_clean = query.replace(" ", "")
-                persons = persons.annotate(
-                    clean_cert=RemoveSpaces(F("personal_info__p_info__자격증"))
-                ).filter(clean_cert__icontains=query_clean)
         else:
-            # 기본은 name 검색
-            if query:
-                query_clean = query.replace(" ", "")
-                persons = persons.annotate(clean_name=RemoveSpaces(F("name"))).filter(
-                    clean_name__icontains=query_clean
+            # 공개 인사카드 column 검색 (certificate는 '자격증' column)
+            column_name = CERTIFICATE_COLUMN if search_by == "certificate" else raw_by
+            column = searchable_columns().get(column_name)
+            if column is None:
+                return Response(
+                    {"detail": f"검색할 수 없는 컬럼입니다: {column_name}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if match not in MATCH_LOOKUPS:
+                return Response(
+                    {"detail": "match는 exact, prefix, contains 중 하나여야 합니다."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            key = normalize_search_key(query)
+            if key and column_name == CERTIFICATE_COLUMN and match == "exact":
+                # 자격증 exact 검색은 문서의 certificates 배열(GIN index)로 처리
+                documents = documents.filter(certificates__contains=[key])
+            elif key:
+                # 정규화된 검색 key table에서 찾음 (btree/trigram index 사용)
+                keys = PersonCardSearchKey.objects.filter(
+                    column=column, **{MATCH_LOOKUPS[match]: key}
+                )
+                documents = documents.filter(person_id__in=keys.values("person_id"))
+            else:
+                # 검색어가 없으면 해당 column 값이 있는 사람 (p_info GIN index)
+                documents = documents.filter(
+                    person__personal_info__p_info__has_key=column_name
                 )
 
-        persons = persons.distinct().order_by("name")
+        p_ids = list(
+            documents.order_by("name", "person_id").values_list("person_id", flat=True)
+        )
+        cards = {
+            person.p_id: person
+            for person in prefetch_person_cards(Person.objects.filter(p_id__in=p_ids))
+        }
+        persons = [cards[p_id] for p_id in p_ids if p_id in cards]
         serializer = PersonCardListSerializer(persons, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-    def get_lower_team_ids(self, team_obj):
-        ids = {team_obj.t_id}
-        for child in team_obj.lower_teams.all():
-            ids.update(self.get_lower_team_ids(child))
-        return ids
-
 
-# Team 이름으로 Team 검색
+# Team 이름(또는 초성)으로 Team 검색 (활성 팀만, 유사도 순)
 class TeamSearchAPIView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, *args, **kwargs):
         query = request.query_params.get("q", "")
-        teams = Team.objects.all().order_by("name")
-        if query:
-            query_clean = query.replace(" ", "")
-            teams = teams.annotate(clean_name=RemoveSpaces(F("name"))).filter(
-                clean_name__icontains=query_clean
-            )
-        serializer = TeamListSerializer(teams, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        query_clean = normalize_search_key(query)
+
+        def build():
+            teams = Team.objects.filter(is_active=True)
+            if has_chosung(query):
+                teams = search_by_chosung(teams, query)
+            else:
+                teams = search_by_name(teams, query_clean)
+            return TeamListSerializer(teams, many=True).data
 
+        # 사용자 입력이 cache key에 들어가지 않도록 검색어가 없는 전체 목록만 캐시
+        data = build() if query_clean else cached_org_payload("search:team:", build)
+        return Response(data, status=status.HTTP_200_OK)
 
-# Coporation 이름으로 Corp 검색
+
+# Coporation 이름으로 Corp 검색 (활성 법인만, 유사도 순)
 class CorpSearchAPIView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, *args, **kwargs):
-        query = request.query_params.get("q", "")
-        corps = Corporation.objects.all().order_by("name")
-        if query:
-            query_clean = query.replace(" ", "")
-            corps = corps.annotate(clean_name=RemoveSpaces(F("name"))).filter(
-                clean_name__icontains=query_clean
+        query_clean = normalize_search_key(request.query_params.get("q", ""))
+
+        def build():
+            corps = search_by_name(
+                Corporation.objects.filter(is_active=True), query_clean
             )
-        serializer = CorpListSerializer(corps, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            return CorpListSerializer(corps, many=True).data
+
+        data = build() if query_clean else cached_org_payload("search:corp:", build)
+        return Response(data, status=status.HTTP_200_OK)
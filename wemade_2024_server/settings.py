@@ -118,6 +118,15 @@ DATABASES = {
     }
 }
 
+# 모든 worker(process)가 공유하는 in-memory cache. 조직도 cache version, 권한 범위,
+# 인사카드 column version 등이 process마다 달라지지 않도록 Redis 사용 (company.checks)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("REDIS_URL", "redis://localhost:6379/0"),
+    }
+}
+
 # DATABASES = {
 #     "default": {
 #         "ENGINE": "django.db.backends.sqlite3",
@@ -218,11 +227,15 @@ SOCIALACCOUNT_EMAIL_AUTHENTICATION = True
 SOCIALACCOUNT_AUTO_SIGNUP = True
 
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    ),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("oauth.authentication.PersonJWTAuthentication",),
 }
 
+# JWT 인증 시 Person row를 담아두는 프로세스 내 LRU 캐시
+OAUTH_PERSON_CACHE_SIZE = 1024
+OAUTH_PERSON_CACHE_TTL = 60  # 초
+# JWT 인증 시 사용자 상태(is_active, token 무효화 시각)를 공유 cache에 담아두는 시간
+OAUTH_TOKEN_STATE_TTL = 60  # 초
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=180),  # 6 months
     "REFRESH_TOKEN_LIFETIME": timedelta(days=365),  # Optional, for token refresh
@@ -264,3 +277,20 @@ AZURE_ACCOUNT_KEY = os.getenv("AZURE_ACCOUNT_KEY")
 AZURE_CONTAINER = os.getenv("AZURE_CONTAINER_NAME")
 
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
+
+# 조직도 과거 시점 복원용 snapshot 주기 (commit 수)
+COMPANY_SNAPSHOT_INTERVAL = 50
+
+# 임시저장 patch가 이 크기(byte)를 넘으면 base 문서로 compaction
+COMPANY_DRAFT_COMPACT_BYTES = 256 * 1024
+
+# 조직도 읽기 캐시 timeout (초). 조직도가 바뀌면 version이 올라가 즉시 무효화됨
+COMPANY_ORG_CACHE_TIMEOUT = 60 * 10
+
+# 사용자별 권한 범위(HR 법인, 팀장인 팀) 캐시 timeout (초)
+COMPANY_AUTH_SCOPE_TIMEOUT = 60 * 30
+
+# 인사카드 column registry(프로세스 내) 재조회 주기 (초). column 변경 시에는 즉시 갱신됨
+PERSONCARD_COLUMN_REGISTRY_TTL = 60
+# 다른 프로세스의 column 변경(공유 cache의 version)을 확인하는 간격 (초)
+PERSONCARD_COLUMN_VERSION_CHECK_INTERVAL = 1